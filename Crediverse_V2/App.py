@@ -9,16 +9,17 @@
 #   7) Suggests improvements
 
 from pathlib import Path
-import base64, uuid
 import streamlit as st
 from PIL import Image
 
 # Local modules
 from app import config  # paths / limits / dirs  :contentReference[oaicite:2]{index=2}
+from app.pipeline import persist_upload
+from app.previews import preview_src
 from app.parsing import extract_text_from_pdf, extract_text_from_docx  # text extractors  :contentReference[oaicite:3]{index=3}
-from app.ai.preprocess import sectionize, tokens
+from app.ai.document import ResumeDocument
 from app.ai.scoring import score_resume
-from app.ai.skills import extract_skills, infer_track, load_skills_map, top_tracks
+from app.ai.skills import extract_skills, infer_track, current_skills, top_tracks
 from app.ai.ats import coverage
 from app.ai.suggestions import suggestions
 
@@ -53,14 +54,13 @@ if up:
         st.stop()
 
     # Save & preview (PDF only)
-    save_path = config.UPLOAD_DIR / f"{uuid.uuid4().hex}{ext}"
-    save_path.write_bytes(data)
+    save_path = persist_upload(data, ext, filename=up.name, source="streamlit")
 
     if ext == ".pdf":
-        with open(save_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
+        # served by the API (signed URL, range requests); inline data URI when
+        # PDF_PREVIEW=inline or the API is not running
         st.markdown(
-            f'<iframe src="data:application/pdf;base64,{b64}" width="700" height="900"></iframe>',
+            f'<iframe src="{preview_src(save_path.name, data)}" width="700" height="900"></iframe>',
             unsafe_allow_html=True,
         )
 
@@ -71,16 +71,14 @@ if up:
         resume_text = extract_text_from_docx(str(save_path))  # :contentReference[oaicite:5]{index=5}
 
     # ---------- AI pipeline ----------
-    sections = sectionize(resume_text)          # split into logical sections
-    score, score_details = score_resume(sections)
-    auto_tokens = tokens(sections["__full__"])  # tokenize the full text
-    auto_skills = extract_skills(auto_tokens)   # skills from tokens
+    doc = ResumeDocument(resume_text)           # sections / tokens computed once, on first use
+    score, score_details = score_resume(doc)
+    auto_skills = extract_skills(doc)           # skills from tokens + phrases
     track = infer_track(auto_skills)            # legacy 1-best guess
 
     # ---------- Multi-track suggestion (NEW) ----------
     # Load skills map & compute top K tracks only *after* we have auto_skills
-    skills_map = load_skills_map(config.BASE_DIR / "app" / "ai" / "skills_map.json")
-    tracks = top_tracks(auto_skills, skills_map, k=3)  # [(track, score, matched), …]
+    tracks = top_tracks(auto_skills, current_skills(), k=3)  # [(track, score, matched), …]
 
     # Choose a best label for the metric box:
     best_track = track
@@ -119,7 +117,7 @@ if up:
 
     # ---------- ATS coverage vs JD ----------
     if jd.strip():
-        pct, present, missing = coverage(sections["__full__"], jd)
+        pct, present, missing = coverage(doc, jd)
         st.subheader("ATS Coverage")
         st.write(f"**{pct}%**")
         st.caption("Present: " + (", ".join(present[:30]) or "—"))
@@ -129,5 +127,5 @@ if up:
 
     # ---------- Improvement tips ----------
     st.subheader("Suggested Improvements")
-    for msg in suggestions(sections, auto_skills, missing):
+    for msg in suggestions(doc, auto_skills, missing):
         st.markdown(f"- {msg}")
@@ -1,125 +1,211 @@
-# App.py — User + Admin (pymysql-only)
+# App.py — User + Admin (pooled MySQL via db.py)
 # ------------------------------------
-# Phase-1 AI flow + Admin panel. No SQLAlchemy required.
+# Phase-1 AI flow + Admin panel.
 
 from pathlib import Path
-import base64, uuid, datetime as dt
+import atexit, hashlib, threading, uuid, datetime as dt
+from urllib.parse import urlencode
 import pandas as pd
+import pymysql
 import streamlit as st
 from PIL import Image
 
 # ---- Internal modules (yours) ----
 from app import config
-from app.parsing import extract_text_from_pdf, extract_text_from_docx
-from app.ai.preprocess import sectionize, tokens
 from app.ai.scoring import score_resume
-from app.ai.skills import extract_skills, infer_track, load_skills_map, top_tracks
+from app.ai.skills import extract_skills, infer_track, current_skills, top_tracks
 from app.ai.ats import coverage
 from app.ai.suggestions import suggestions
+from app.ai.document import ResumeDocument
+from app.pipeline import prepare, index_resume, persist_upload, page_count, upload_name
+from app.previews import preview_src
+from app.writebehind import WriteBehind
+from app.manifest import get_upload_manifest
 
 # ---- DB + charts ----
-import pymysql
+from migrations import MIGRATIONS, migrate
+from db import mysql_cfg, admin_creds, db_conn, create_database, pool_stats, records_filter, records_page
+from db import seed_skills, link_skills, split_skills
 import plotly.express as px
 
 # ---------- Page setup ----------
 st.set_page_config(page_title="AI Resume Analyzer", page_icon="📝", layout="wide")
 
 # ---------- Small helpers ----------
-def show_pdf(path: Path):
-    """Inline preview for PDFs only."""
-    with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode()
+def show_pdf(name: str, data: bytes):
+    """Preview for PDFs only (API URL or inline data URI, see previews.preview_src)."""
     st.markdown(
-        f'<iframe src="data:application/pdf;base64,{b64}" width="700" height="900"></iframe>',
+        f'<iframe src="{preview_src(name, data)}" width="700" height="900"></iframe>',
         unsafe_allow_html=True,
     )
 
-def mysql_cfg():
-    """Fetch MySQL secrets; return {} if missing."""
-    return st.secrets.get("mysql", {})
-
-def get_db_conn(db_required=True):
-    """
-    Return a pymysql connection using st.secrets['mysql'].
-    If db_required=True, connect to that database; otherwise connect to server only.
-    """
-    cfg = mysql_cfg()
-    if not cfg:
+@st.cache_resource(show_spinner=False)
+def _ensure_schema():
+    """Create the DB and apply pending migrations once per process; a failure is not cached, so the next rerun retries."""
+    if not mysql_cfg():
         raise RuntimeError("MySQL credentials not found in .streamlit/secrets.toml")
-    host = cfg.get("host", "localhost")
-    user = cfg.get("user", "root")
-    password = cfg.get("password", "")
-    db = cfg.get("db", "cv")
-    if db_required:
-        return pymysql.connect(host=host, user=user, password=password, database=db, autocommit=True)
-    return pymysql.connect(host=host, user=user, password=password, autocommit=True)
+    create_database()
+    applied = migrate()
+    with db_conn() as conn, conn.cursor() as cur:
+        seed_skills(cur, current_skills().canon)  # skills_map.json + SKILL_BANK
+    return applied
 
 def init_db():
-    """Create DB and table if missing. Safe to call on every startup."""
+    """Create DB and schema if missing. Safe to call on every rerun (runs once per process)."""
     try:
-        # Create DB if missing
-        conn = get_db_conn(db_required=False)
-        with conn.cursor() as cur:
-            cur.execute("CREATE DATABASE IF NOT EXISTS cv CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;")
-        conn.close()
-
-        # Create table if missing
-        conn = get_db_conn(db_required=True)
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS user_data(
-                    ID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-                    Name VARCHAR(200),
-                    Email_ID VARCHAR(200),
-                    Resume_Score INT,
-                    Timestamp VARCHAR(50),
-                    Page_no INT,
-                    Predicted_Field VARCHAR(100),
-                    User_level VARCHAR(50),
-                    Actual_skills TEXT,
-                    Recommended_skills TEXT,
-                    Recommended_courses TEXT
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """)
-        conn.close()
-        return True, "Database ready."
+        _ensure_schema()
+        return True, f"Database ready (schema v{MIGRATIONS[-1][0]})."
     except Exception as e:
         return False, f"DB init failed: {e}"
 
-def insert_row(name, email, score, pages, reco_field, user_level, skills, rec_skills, courses):
-    """Insert one analysis row; returns True/False."""
-    try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO user_data
-                (Name, Email_ID, Resume_Score, Timestamp, Page_no, Predicted_Field, User_level,
-                 Actual_skills, Recommended_skills, Recommended_courses)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                """,
-                (
-                    name or "",
-                    email or "",
-                    int(score),
-                    dt.datetime.now().strftime("%Y-%m-%d_%H:%M:%S"),
-                    int(pages or 0),
-                    reco_field or "",
-                    user_level or "",
-                    skills or "",
-                    rec_skills or "",
-                    courses or "",
-                ),
-            )
-        conn.close()
-        return True
-    except Exception:
-        return False
+# a retried batch hits the unique Analysis_UID and leaves the existing row alone
+_INSERT_SQL = """
+    INSERT INTO user_data
+    (Analysis_UID, Name, Email_ID, Resume_Score, Timestamp, Page_no, Predicted_Field, User_level,
+     Actual_skills, Recommended_skills, Recommended_courses)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE ID = ID
+"""
 
-def admin_creds():
-    """Admin username/password from secrets with sensible defaults."""
-    sec = st.secrets.get("admin", {})
-    return sec.get("username", "admin"), sec.get("password", "admin123")
+def _flush_rows(rows):
+    """
+    Writer-thread side, per batch: one multi-row INSERT into user_data, one lookup of
+    the new IDs by Analysis_UID, then the candidate_skills links in bulk.
+    """
+    _ensure_schema()
+    rows = [r if len(r) == 11 else (uuid.uuid4().hex, *r) for r in rows]  # rows spilled before Analysis_UID
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.executemany(_INSERT_SQL, rows)
+        uids = [r[0] for r in rows]
+        cur.execute(f"SELECT Analysis_UID, ID FROM user_data WHERE Analysis_UID IN ({','.join(['%s'] * len(uids))})",
+                    uids)
+        ids = dict(cur.fetchall())
+        link_skills(cur, [(ids[r[0]], split_skills(r[8])) for r in rows if r[0] in ids])
+
+@st.cache_resource(show_spinner=False)
+def row_writer():
+    """Process-wide write-behind queue for user_data rows."""
+    # constraint / value errors blame the rows (dead-lettered); anything else means MySQL is unavailable (spilled)
+    w = WriteBehind(_flush_rows, config.DB_SPILL_PATH, batch_size=config.DB_WRITE_BATCH,
+                    flush_s=config.DB_FLUSH_S, max_queue=config.DB_WRITE_QUEUE,
+                    row_errors=(pymysql.err.IntegrityError, pymysql.err.DataError, ValueError, TypeError)).start()
+    atexit.register(w.stop)
+    return w
+
+def insert_row(name, email, score, pages, reco_field, user_level, skills, rec_skills, courses, uid=None):
+    """Queue one analysis row for the background writer; returns False if no DB is configured."""
+    if not mysql_cfg():
+        return False
+    row_writer().put((
+        uid or uuid.uuid4().hex,
+        name or "",
+        email or "",
+        int(score),
+        dt.datetime.now().replace(microsecond=0),
+        int(pages or 0),
+        reco_field or "",
+        user_level or "",
+        skills or "",
+        rec_skills or "",
+        courses or "",
+    ))
+    return True
+
+@st.cache_data(ttl=config.DASHBOARD_TTL_S, show_spinner=False)
+def dashboard_data():
+    """KPIs, the latest rows and the two distributions, aggregated by MySQL (cost is flat in table size)."""
+    with db_conn() as conn:
+        kpi = pd.read_sql("SELECT COUNT(*) AS total, COUNT(DISTINCT Email_ID) AS emails, "
+                          "AVG(Resume_Score) AS avg_score FROM user_data", conn).iloc[0]
+        latest = pd.read_sql("SELECT * FROM user_data ORDER BY ID DESC LIMIT 20", conn)
+        fields = pd.read_sql("SELECT Predicted_Field, COUNT(*) AS n FROM user_data GROUP BY Predicted_Field", conn)
+        levels = pd.read_sql("SELECT User_level, COUNT(*) AS n FROM user_data GROUP BY User_level", conn)
+    avg = kpi["avg_score"]
+    return {
+        "total": int(kpi["total"]),
+        "emails": int(kpi["emails"]),
+        "avg_score": round(float(avg), 1) if pd.notna(avg) else 0,
+        "latest": latest,
+        "fields": fields,
+        "levels": levels,
+    }
+
+@st.cache_data(ttl=config.DASHBOARD_TTL_S, show_spinner=False)
+def skill_frequency(field=None, days=None, limit=20):
+    """Most common skills, optionally among one Predicted_Field and/or the last `days` days."""
+    where, params = [], []
+    if field:
+        where.append("u.Predicted_Field = %s")
+        params.append(field)
+    if days:
+        where.append("u.Timestamp >= %s")
+        params.append(dt.datetime.now() - dt.timedelta(days=days))
+    join = " JOIN user_data u ON u.ID = cs.candidate_id" if where else ""
+    sql = ("SELECT s.skill_id, s.name AS skill, COUNT(*) AS candidates FROM candidate_skills cs"
+           + join + " JOIN skills s ON s.skill_id = cs.skill_id"
+           + (" WHERE " + " AND ".join(where) if where else "")
+           + " GROUP BY s.skill_id, s.name ORDER BY candidates DESC LIMIT %s")
+    with db_conn() as conn:
+        return pd.read_sql(sql, conn, params=[*params, int(limit)])
+
+@st.cache_data(ttl=config.DASHBOARD_TTL_S, show_spinner=False)
+def skill_cooccurrence(skill_ids):
+    """Candidates having both skills, for every pair among `skill_ids` (a self-join on the link table)."""
+    if len(skill_ids) < 2:
+        return pd.DataFrame(columns=["a", "b", "candidates"])
+    ph = ",".join(["%s"] * len(skill_ids))
+    sql = ("SELECT sa.name AS a, sb.name AS b, COUNT(*) AS candidates "
+           "FROM candidate_skills x JOIN candidate_skills y "
+           "  ON y.candidate_id = x.candidate_id AND y.skill_id > x.skill_id "
+           "JOIN skills sa ON sa.skill_id = x.skill_id JOIN skills sb ON sb.skill_id = y.skill_id "
+           f"WHERE x.skill_id IN ({ph}) AND y.skill_id IN ({ph}) GROUP BY sa.name, sb.name")
+    with db_conn() as conn:
+        return pd.read_sql(sql, conn, params=[*skill_ids, *skill_ids])
+
+@st.cache_data(ttl=config.DASHBOARD_TTL_S, show_spinner=False)
+def skill_names():
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT name FROM skills ORDER BY name")
+        return [r[0] for r in cur.fetchall()]
+
+@st.cache_data(ttl=config.DASHBOARD_TTL_S, show_spinner=False)
+def candidates_with_all(skills):
+    """How many candidates list every one of `skills`."""
+    if not skills:
+        return 0
+    ph = ",".join(["%s"] * len(skills))
+    sql = ("SELECT COUNT(*) FROM (SELECT cs.candidate_id FROM candidate_skills cs "
+           f"JOIN skills s ON s.skill_id = cs.skill_id WHERE s.name IN ({ph}) "
+           "GROUP BY cs.candidate_id HAVING COUNT(*) = %s) t")
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.execute(sql, [*skills, len(skills)])
+        return cur.fetchone()[0]
+
+# ---------- Rerun-safe pipeline stages ----------
+# Streamlit reruns the script on every widget change. Each stage is memoized on what it
+# depends on: the upload's sha256, the skills-map version, the JD hash. Arguments with a
+# leading underscore are not hashed by st.cache_data.
+@st.cache_data(show_spinner=False, max_entries=256)
+def stage_prepare(sha, ext, _data):
+    """Extract → sectionize → tokenize → score (depends on the file only)."""
+    doc = ResumeDocument.from_prepared(prepare(_data, ext, sha))
+    score, score_details = score_resume(doc)
+    return {"doc": doc, "score": score, "score_details": score_details, "pages": page_count(doc.sections)}
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def stage_skills(sha, skills_version, _doc):
+    """Skills + tracks (depends on the file and on the skills map)."""
+    skills = extract_skills(_doc)
+    tracks = top_tracks(skills, current_skills(), k=3)  # [(track, score, matched)]
+    # fallback if empty
+    fallback = infer_track(skills)
+    best = tracks[0][0] if (tracks and tracks[0][1] > 0) else (fallback or "General Software")
+    return {"skills": skills, "tracks": tracks, "best_track": best}
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def stage_ats(sha, jd_hash, _doc, _jd):
+    """ATS coverage (the only JD-dependent stage)."""
+    return coverage(_doc, _jd)
 
 # ---------- Header ----------
 col1, col2 = st.columns([1, 4])
@@ -154,31 +240,30 @@ if mode == "User":
             st.error(f"File is {size_mb:.1f} MB; limit {config.MAX_FILE_MB} MB.")
             st.stop()
 
-        # ---- Save + preview (pdf only) ----
-        save_name = f"{uuid.uuid4().hex}{ext}"
-        save_path = config.UPLOAD_DIR / save_name
-        save_path.write_bytes(data)
+        # ---- Save once per unique upload (background, content-addressed) + preview (pdf only) ----
+        sha = hashlib.sha256(data).hexdigest()
+        name = upload_name(ext, sha)
+        seen = st.session_state.setdefault("SEEN_UPLOADS", {})  # sha -> {"uid", "stored"}
+        first = sha not in seen
+        if first:
+            seen[sha] = {"uid": uuid.uuid4().hex, "stored": False}  # uid links file, manifest and DB row
+            threading.Thread(target=persist_upload,
+                             args=(data, ext, sha, up.name, seen[sha]["uid"], "streamlit", name),
+                             daemon=True).start()
         if ext == ".pdf":
-            show_pdf(save_path)
+            show_pdf(name, data)
 
-        # ---- Extract text ----
-        if ext == ".pdf":
-            resume_text = extract_text_from_pdf(str(save_path))
-        else:
-            resume_text = extract_text_from_docx(str(save_path))
-
-        # ---- AI pipeline ----
-        sections = sectionize(resume_text)
-        score, score_details = score_resume(sections)
-        auto_tokens = tokens(sections["__full__"])
-        auto_skills = extract_skills(auto_tokens)
+        # ---- Extract text + sections + tokens + score (memoized by content hash) ----
+        prep = stage_prepare(sha, ext, data)
+        doc = prep["doc"]
+        sections = doc.sections
+        score, score_details = prep["score"], prep["score_details"]
+        if first:
+            index_resume(sha, doc.tokens, up.name)  # candidate search (best effort)
 
-        # Map-driven multi-track suggestion
-        skills_map = load_skills_map(config.BASE_DIR / "app" / "ai" / "skills_map.json")
-        tracks = top_tracks(auto_skills, skills_map, k=3)  # [(track, score, matched)]
-        # fallback if empty
-        _fallback = infer_track(auto_skills)
-        best_track = tracks[0][0] if (tracks and tracks[0][1] > 0) else (_fallback or "General Software")
+        # ---- Skills + map-driven multi-track suggestion (memoized by hash + skills-map version) ----
+        sk = stage_skills(sha, current_skills().version, doc)
+        auto_skills, tracks, best_track = sk["skills"], sk["tracks"], sk["best_track"]
 
         # ---- KPI row ----
         c1, c2, c3 = st.columns(3)
@@ -208,7 +293,8 @@ if mode == "User":
 
         # ---- ATS coverage ----
         if jd.strip():
-            pct, present, missing = coverage(sections["__full__"], jd)
+            jd_hash = hashlib.sha256(jd.encode()).hexdigest()
+            pct, present, missing = stage_ats(sha, jd_hash, doc, jd)
             st.subheader("ATS Coverage")
             st.write(f"**{pct}%**")
             st.caption("Present: " + (", ".join(present[:30]) or "—"))
@@ -218,31 +304,33 @@ if mode == "User":
 
         # ---- Suggestions ----
         st.subheader("Suggested Improvements")
-        for msg in suggestions(sections, auto_skills, missing):
+        for msg in suggestions(doc, auto_skills, missing):
             st.markdown(f"- {msg}")
 
-        # ---- Store to DB (best effort) ----
-        pages = len(sections.get("__pages__", [])) or 1
+        # ---- Store to DB (best effort, once per upload) ----
+        pages = prep["pages"]
         user_level = "Fresher" if pages == 1 else ("Intermediate" if pages == 2 else "Experienced")
         skills_csv = ", ".join(auto_skills)
         rec_skills = ""    # hook up to your rules if/when you add them
         rec_courses = ""   # idem
 
-        ok = insert_row(
-            name=sections.get("__name__", ""),  # add your name extractor if available
-            email="",                            # add your email extractor if available
-            score=score,
-            pages=pages,
-            reco_field=best_track,
-            user_level=user_level,
-            skills=skills_csv,
-            rec_skills=rec_skills,
-            courses=rec_courses,
-        )
-        if ok:
-            st.success("Saved summary to the database (if configured).")
+        if not seen[sha]["stored"]:
+            seen[sha]["stored"] = insert_row(
+                name=sections.get("__name__", ""),  # add your name extractor if available
+                email="",                            # add your email extractor if available
+                score=score,
+                pages=pages,
+                reco_field=best_track,
+                user_level=user_level,
+                skills=skills_csv,
+                rec_skills=rec_skills,
+                courses=rec_courses,
+                uid=seen[sha]["uid"],
+            )
+        if seen[sha]["stored"]:
+            st.success("Summary queued for the database.")
         else:
-            st.info("Skipped DB write (missing or unreachable DB).")
+            st.info("Skipped DB write (no MySQL configured).")
 
 # ======================================================================================
 #                                        ADMIN
@@ -280,36 +368,65 @@ else:
     # ---------------------- Dashboard ----------------------
     with tab_dash:
         try:
-            conn = get_db_conn()
-            df = pd.read_sql("SELECT * FROM user_data ORDER BY ID DESC", conn)
-            conn.close()
+            dash = dashboard_data()
         except Exception as e:
-            df = pd.DataFrame()
+            dash = {"total": 0, "emails": 0, "avg_score": 0}
             st.error(f"DB read failed: {e}")
 
         c1, c2, c3 = st.columns(3)
         with c1:
-            st.metric("Total Records", len(df))
+            st.metric("Total Records", dash["total"])
         with c2:
-            st.metric("Unique Emails", df["Email_ID"].nunique() if not df.empty else 0)
+            st.metric("Unique Emails", dash["emails"])
         with c3:
-            st.metric("Avg Score", round(df["Resume_Score"].mean(), 1) if not df.empty else 0)
+            st.metric("Avg Score", dash["avg_score"])
+        st.caption(f"Refreshed at most every {config.DASHBOARD_TTL_S}s.")
 
-        if df.empty:
+        if not dash["total"]:
             st.info("No data yet.")
         else:
             st.write("Latest 20:")
-            st.dataframe(df.head(20), use_container_width=True)
+            st.dataframe(dash["latest"], use_container_width=True)
 
             left, right = st.columns(2)
             with left:
-                if "Predicted_Field" in df:
-                    fig1 = px.pie(df, names="Predicted_Field", title="Predicted Field Distribution")
-                    st.plotly_chart(fig1, use_container_width=True)
+                fig1 = px.pie(dash["fields"], names="Predicted_Field", values="n",
+                              title="Predicted Field Distribution")
+                st.plotly_chart(fig1, use_container_width=True)
             with right:
-                if "User_level" in df:
-                    fig2 = px.pie(df, names="User_level", title="User Level")
-                    st.plotly_chart(fig2, use_container_width=True)
+                fig2 = px.pie(dash["levels"], names="User_level", values="n", title="User Level")
+                st.plotly_chart(fig2, use_container_width=True)
+
+            # ---- Skills (candidate_skills) ----
+            st.write("Skills")
+            f1, f2 = st.columns(2)
+            with f1:
+                sk_field = st.selectbox("Field", ["All"] + sorted(dash["fields"]["Predicted_Field"].dropna().tolist()))
+            with f2:
+                periods = {"All time": None, "Last 30 days": 30, "Last 7 days": 7}
+                sk_days = periods[st.selectbox("Period", list(periods))]
+            try:
+                freq = skill_frequency(None if sk_field == "All" else sk_field, sk_days)
+                if freq.empty:
+                    st.info("No skills recorded for this selection.")
+                else:
+                    left, right = st.columns(2)
+                    with left:
+                        fig3 = px.bar(freq, x="candidates", y="skill", orientation="h", title="Top 20 skills")
+                        fig3.update_layout(yaxis={"categoryorder": "total ascending"})
+                        st.plotly_chart(fig3, use_container_width=True)
+                    with right:
+                        pairs = skill_cooccurrence(tuple(int(i) for i in freq["skill_id"].head(12)))
+                        if not pairs.empty:
+                            grid = pairs.pivot_table(index="a", columns="b", values="candidates", fill_value=0)
+                            fig4 = px.imshow(grid, text_auto=True, title="Skill co-occurrence (top 12)")
+                            st.plotly_chart(fig4, use_container_width=True)
+
+                combo = st.multiselect("Candidates who know all of", skill_names())
+                if combo:
+                    st.metric("Matching candidates", candidates_with_all(tuple(sorted(combo))))
+            except Exception as e:
+                st.error(f"Skill analytics unavailable: {e}")
 
     # ---------------------- Records ----------------------
     with tab_records:
@@ -320,49 +437,57 @@ else:
         date_from = st.date_input("From", value=None)
         date_to = st.date_input("To", value=None)
 
-        # Query
-        where = []
-        params = []
-        if q:
-            where.append("(Name LIKE %s OR Email_ID LIKE %s OR Predicted_Field LIKE %s)")
-            like = f"%{q}%"
-            params += [like, like, like]
-        if date_from:
-            where.append("Timestamp >= %s")
-            params.append(str(date_from))
-        if date_to:
-            where.append("Timestamp <= %s")
-            params.append(str(date_to) + " 23:59:59")
-
-        sql = "SELECT * FROM user_data"
-        if where:
-            sql += " WHERE " + " AND ".join(where)
-        sql += " ORDER BY ID DESC"
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 200], index=1)
+
+        # Keyset pagination: remember the last ID of every page visited; a new filter starts over
+        where, params = records_filter(q, date_from, date_to)
+        key = (q, str(date_from), str(date_to), page_size)
+        if st.session_state.get("REC_KEY") != key:
+            st.session_state.REC_KEY = key
+            st.session_state.REC_CURSORS = [None]
+        cursors = st.session_state.REC_CURSORS
 
         try:
-            conn = get_db_conn()
-            df = pd.read_sql(sql, conn, params=params)
-            conn.close()
+            cols, rows = records_page(where, params, cursors[-1], page_size + 1)
+            df = pd.DataFrame(rows[:page_size], columns=cols)
+            has_next = len(rows) > page_size
         except Exception as e:
-            df = pd.DataFrame()
+            df, has_next = pd.DataFrame(), False
             st.error(f"DB read failed: {e}")
 
         st.dataframe(df, use_container_width=True, height=400)
 
-        # CSV export
-        if not df.empty:
-            csv = df.to_csv(index=False).encode()
-            st.download_button("Download CSV", csv, "user_data.csv", "text/csv")
+        b1, b2, b3, b4 = st.columns([1, 1, 1, 3])
+        with b1:
+            if st.button("⏮ First", disabled=len(cursors) == 1):
+                st.session_state.REC_CURSORS = [None]
+                st.rerun()
+        with b2:
+            if st.button("◀ Prev", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with b3:
+            if st.button("Next ▶", disabled=not has_next):
+                cursors.append(int(df["ID"].iloc[-1]))
+                st.rerun()
+        with b4:
+            st.caption(f"Page {len(cursors)}")
+
+        # CSV export: streamed by the API in keyset chunks, so memory stays flat for any result size
+        export_q = {k: v for k, v in {"q": q, "date_from": date_from, "date_to": date_to}.items() if v}
+        st.markdown(f"[Download CSV]({config.API_BASE_URL}/export/user_data.csv?{urlencode(export_q)}) "
+                    "(served by the API; sign in with the admin credentials)")
 
         # Delete by ID
         del_id = st.number_input("Delete record by ID", min_value=1, step=1)
         if st.button("Delete"):
             try:
-                conn = get_db_conn()
-                with conn.cursor() as cur:
+                with db_conn() as conn, conn.cursor() as cur:
                     cur.execute("DELETE FROM user_data WHERE ID=%s", (int(del_id),))
-                    conn.commit()
-                conn.close()
+                dashboard_data.clear()
+                skill_frequency.clear()
+                skill_cooccurrence.clear()
+                candidates_with_all.clear()
                 st.success(f"Deleted ID {del_id}. Refresh the page to see changes.")
             except Exception as e:
                 st.error(f"Delete failed: {e}")
@@ -370,15 +495,49 @@ else:
     # ---------------------- Uploads ----------------------
     with tab_uploads:
         st.write("Files in your upload folder")
-        up_dir = config.UPLOAD_DIR
-        files = sorted([p for p in up_dir.glob("*") if p.is_file()],
-                       key=lambda x: x.stat().st_mtime, reverse=True)
+        manifest = get_upload_manifest()
+        m = manifest.stats()
+        st.caption(f"{m['files']} files, {round(m['bytes'] / 1024 / 1024, 1)} MB (from the upload manifest)")
+        if st.button("Rescan folder", help="Add files copied into the folder by hand; walks the whole directory"):
+            st.success(f"Added {manifest.rescan(config.UPLOAD_DIR)} file(s) to the manifest.")
+            st.session_state.UP_CURSORS = [None]
+
+        up_cursors = st.session_state.setdefault("UP_CURSORS", [None])
+        files = manifest.page(up_cursors[-1], 51)
         if not files:
             st.info("No files yet.")
         else:
-            for p in files[:50]:
-                st.write(f"{p.name} — {round(p.stat().st_size/1024, 1)} KB — "
-                         f"{dt.datetime.fromtimestamp(p.stat().st_mtime)}")
+            st.dataframe(pd.DataFrame([{
+                "File": f["name"],
+                "Original name": f["original_name"],
+                "KB": round(f["size"] / 1024, 1),
+                "Saved": dt.datetime.fromtimestamp(f["mtime"]),
+                "SHA-256": (f["sha256"] or "")[:12],
+                "Analyses": f["analyses"],
+                "Last analysis UID": f["last_analysis_uid"],
+                "Source": f["source"],
+            } for f in files[:50]]), use_container_width=True, hide_index=True)
+            linked = [f for f in files[:50] if f["analyses"] > 1]
+            if linked:
+                with st.expander("Files analyzed more than once"):
+                    pick = st.selectbox("File", linked, format_func=lambda f: f"{f['name']} ({f['analyses']} analyses)")
+                    st.dataframe(pd.DataFrame([{
+                        "Analysis UID": a["analysis_uid"],
+                        "Original name": a["original_name"],
+                        "Source": a["source"],
+                        "Analyzed": dt.datetime.fromtimestamp(a["created"]),
+                    } for a in manifest.analyses(pick["id"])]), use_container_width=True, hide_index=True)
+            u1, u2, u3 = st.columns([1, 1, 4])
+            with u1:
+                if st.button("◀ Newer", disabled=len(up_cursors) == 1):
+                    up_cursors.pop()
+                    st.rerun()
+            with u2:
+                if st.button("Older ▶", disabled=len(files) <= 50):
+                    up_cursors.append(files[49]["id"])
+                    st.rerun()
+            with u3:
+                st.caption(f"Page {len(up_cursors)}")
 
     # ---------------------- Settings ----------------------
     with tab_settings:
@@ -396,3 +555,12 @@ else:
             st.warning("Your mysql block is not a valid mapping (dict). "
                    "Please check .streamlit/secrets.toml.")
             st.code(str(cfg))
+
+        st.write("**Connection pool (shared by all sessions)**")
+        try:
+            st.json(pool_stats())
+        except Exception as e:
+            st.warning(f"Pool unavailable: {e}")
+
+        st.write("**Write-behind queue (analysis rows)**")
+        st.json(row_writer().stats())
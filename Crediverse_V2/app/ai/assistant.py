@@ -1,24 +1,16 @@
 # app/ai/assistant.py
 from __future__ import annotations
-import re
 from typing import Dict, List, Tuple
 
-# --------- tiny helpers (no NLTK needed) ---------
-_STOP = set("""
-the a an and or of in on for with to from by as at is are be this that those these
-your you we our their i me my he she they them his her its was were been being
-""".split())
-
-def _tokens(text: str) -> List[str]:
-    """Simple, fast tokenizer suitable for ATS-ish keyword matching."""
-    words = re.findall(r"[A-Za-z][A-Za-z0-9+\-#\.]*", (text or "").lower())
-    return [w for w in words if w not in _STOP and len(w) > 2]
+from .document import ResumeDocument
+from .preprocess import tokens
 
+# --------- tiny helpers ---------
 def _keywords(text: str) -> List[str]:
-    """Unique keywords preserving order of first appearance."""
+    """Unique keywords (preprocess.tokens, same as ATS coverage) preserving order of first appearance."""
     seen = set()
     out: List[str] = []
-    for w in _tokens(text):
+    for w in tokens(text):
         if w not in seen:
             seen.add(w)
             out.append(w)
@@ -36,12 +28,12 @@ def _choose_summary(skills: List[str]) -> str:
 
 # -------------------------------------------------
 
-def _jd_gap(resume_text: str, jd_text: str | None) -> Dict:
+def _jd_gap(doc: ResumeDocument, jd_text: str | None) -> Dict:
     """Compare JD vs Resume keywords (lightweight ATS-style)."""
     if not jd_text:
         return {"coverage": None, "present": [], "missing": []}
 
-    res_keys = set(_keywords(resume_text))
+    res_keys = doc.token_set
     jd_keys  = _keywords(jd_text)
 
     present = [k for k in jd_keys if k in res_keys]
@@ -50,17 +42,25 @@ def _jd_gap(resume_text: str, jd_text: str | None) -> Dict:
     return {"coverage": coverage, "present": present[:50], "missing": missing[:50]}
 
 def generate_improvements(
-    resume_text: str,
-    detected_skills: List[str],
-    section_presence: Dict[str, bool],
+    resume: str | ResumeDocument,
+    detected_skills: List[str] | None = None,
+    section_presence: Dict[str, bool] | None = None,
     jd_text: str | None = None
 ) -> Dict:
     """
+    `resume` is the resume text or a ResumeDocument; skills and section presence
+    default to the document's own.
     Return a dict with:
       - improved_summary: str
       - suggestions: Dict[str, List[str]]   # bullets grouped by section
       - jd_match: {coverage, present, missing}
     """
+    doc = resume if isinstance(resume, ResumeDocument) else ResumeDocument(resume)
+    if detected_skills is None:
+        detected_skills = doc.skills
+    if section_presence is None:
+        section_presence = doc.section_presence
+
     suggestions: Dict[str, List[str]] = {
         "Summary": [],
         "Experience": [],
@@ -110,7 +110,7 @@ def generate_improvements(
     base_summary = _choose_summary(detected_skills)
 
     # --- JD match (optional) ---
-    jd_match = _jd_gap(resume_text, jd_text)
+    jd_match = _jd_gap(doc, jd_text)
 
     return {
         "improved_summary": base_summary,
@@ -1,17 +1,99 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+from scipy import sparse
 from rapidfuzz import fuzz, process
+from .document import ResumeDocument
 from .preprocess import tokens
 
-def coverage(resume_text: str, jd_text: str, min_score=90):
-    r = set(tokens(resume_text))
+def coverage(resume, jd_text: str, min_score=90, workers: int = 1):
+    """
+    Share of JD terms found in the resume (exact or fuzz.ratio >= min_score).
+    `resume` is the resume text or a ResumeDocument, whose token set is reused.
+    Terms without an exact hit are scored against the resume vocabulary in one
+    rapidfuzz cdist call; `workers` stays 1 since analyses already run in a pool.
+    """
+    r = resume.token_set if isinstance(resume, ResumeDocument) else set(tokens(resume))
     j = set(tokens(jd_text))
-    present, missing = [], []
-    for term in j:
-        if term in r:
-            present.append(term); continue
-        match = process.extractOne(term, r, scorer=fuzz.ratio)
-        if match and match[1] >= min_score:
-            present.append(term)
-        else:
-            missing.append(term)
+    present = [t for t in j if t in r]
+    rest = [t for t in j if t not in r]
+    missing = rest
+    if rest and r:
+        scores = process.cdist(rest, list(r), scorer=fuzz.ratio, score_cutoff=min_score, workers=workers)
+        hit = (scores >= min_score).any(axis=1)
+        present += [t for t, h in zip(rest, hit) if h]
+        missing = [t for t, h in zip(rest, hit) if not h]
     pct = 0 if not j else round(100 * len(present) / len(j))
     return pct, sorted(present), sorted(missing)
+
+
+# --- Bulk mode: M resumes x N JDs ---
+
+def _incidence(term_sets: List[set], vocab_id: dict) -> sparse.csc_matrix:
+    """vocab x docs 0/1 matrix."""
+    rows = [vocab_id[t] for ts in term_sets for t in ts]
+    cols = [i for i, ts in enumerate(term_sets) for _ in ts]
+    data = np.ones(len(rows), dtype=np.float32)
+    return sparse.csc_matrix((data, (rows, cols)), shape=(len(vocab_id), len(term_sets)))
+
+class CoverageMatrix:
+    """
+    Result of coverage_matrix(): `percent[i, j]` is coverage(resumes[i], jds[j])[0].
+    Present/missing term lists are only built when asked for via details().
+    """
+
+    def __init__(self, percent, resume_terms, jd_terms, r_id, j_id, hits):
+        self.percent: np.ndarray = percent
+        self._resume_terms = resume_terms
+        self._jd_terms = jd_terms
+        self._r_id = r_id
+        self._j_id = j_id
+        self._hits = hits  # JD vocab x resume vocab (CSR), 1 where fuzz.ratio >= min_score
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.percent.shape
+
+    def details(self, i: int, j: int):
+        """(pct, present, missing) for resume i vs JD j, same as coverage()."""
+        r_ids = {self._r_id[t] for t in self._resume_terms[i]}
+        indptr, indices = self._hits.indptr, self._hits.indices
+        present, missing = [], []
+        for term in self._jd_terms[j]:
+            k = self._j_id[term]
+            hit = any(int(c) in r_ids for c in indices[indptr[k]:indptr[k + 1]])
+            (present if hit else missing).append(term)
+        return int(self.percent[i, j]), sorted(present), sorted(missing)
+
+def coverage_matrix(resumes: Sequence[str], jds: Sequence[str], min_score=90,
+                    workers: int = -1, chunk_rows: int = 2048) -> CoverageMatrix:
+    """
+    coverage() for every resume x JD pair. Each document is tokenized once, all term
+    similarities come from batched rapidfuzz cdist calls (multi-threaded via `workers`),
+    and the per-pair counts are sparse matrix products instead of Python loops.
+    """
+    r_terms = [set(tokens(t)) for t in resumes]
+    j_terms = [set(tokens(t)) for t in jds]
+    r_vocab = sorted(set().union(*r_terms))
+    j_vocab = sorted(set().union(*j_terms))
+    r_id = {t: k for k, t in enumerate(r_vocab)}
+    j_id = {t: k for k, t in enumerate(j_vocab)}
+
+    # JD term x resume term hits; scored in row chunks to bound cdist's dense output
+    blocks = []
+    for start in range(0, len(j_vocab), chunk_rows):
+        if not r_vocab:
+            break
+        scores = process.cdist(j_vocab[start:start + chunk_rows], r_vocab, scorer=fuzz.ratio,
+                               score_cutoff=min_score, workers=workers)
+        blocks.append(sparse.csr_matrix(scores >= min_score, dtype=np.float32))
+    hits = (sparse.vstack(blocks, format="csr") if blocks
+            else sparse.csr_matrix((len(j_vocab), len(r_vocab)), dtype=np.float32))
+
+    R = _incidence(r_terms, r_id)                     # resume vocab x M
+    J = _incidence(j_terms, j_id)                     # JD vocab x N
+    present = (hits @ R) > 0                          # JD vocab x M: term found in resume m
+    counts = (present.T.astype(np.float32) @ J).toarray()  # M x N present-term counts
+    sizes = np.array([len(t) for t in j_terms], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(sizes > 0, np.rint(100 * counts / sizes), 0).astype(int)
+    return CoverageMatrix(percent, r_terms, j_terms, r_id, j_id, hits)
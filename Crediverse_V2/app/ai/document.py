@@ -0,0 +1,75 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import Dict, FrozenSet, List, Optional
+
+from .preprocess import SECTION_PATTERNS, Sections, sectionize, tokens
+
+
+class ResumeDocument:
+    """
+    One resume, with every derived view computed on first use and then kept: the
+    normalized text, sections, tokens, token set, per-section token sets and skills.
+    The scoring, skills, ATS and suggestion stages all accept a ResumeDocument, so a
+    document passed through the whole pipeline is sectionized and tokenized once.
+    """
+
+    def __init__(self, text: str = "", page_count: Optional[int] = None,
+                 sections: Optional[Sections] = None, tokens: Optional[List[str]] = None):
+        self._raw = text
+        self._page_count = page_count
+        if sections is not None:
+            self.__dict__["sections"] = sections
+        if tokens is not None:
+            self.__dict__["tokens"] = tokens
+        self._skills: Dict[tuple, List[str]] = {}
+
+    @classmethod
+    def from_prepared(cls, prep: dict) -> "ResumeDocument":
+        """Wrap a pipeline.prepare() result (sections and tokens are reused as they are)."""
+        return cls(sections=prep["sections"], tokens=prep["tokens"])
+
+    @cached_property
+    def sections(self) -> Sections:
+        sections = sectionize(self._raw)
+        if self._page_count is not None:
+            sections["__page_count__"] = self._page_count
+        return sections
+
+    @property
+    def text(self) -> str:
+        """The normalized full text."""
+        return self.sections["__full__"]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return tokens(self.text)
+
+    @cached_property
+    def token_set(self) -> FrozenSet[str]:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def section_presence(self) -> Dict[str, bool]:
+        return {name: bool(self.sections.get(name)) for name in SECTION_PATTERNS}
+
+    @cached_property
+    def section_tokens(self) -> Dict[str, FrozenSet[str]]:
+        """Token set of every section found in the document."""
+        return {name: frozenset(tokens(self.sections[name])) for name in self.sections.spans}
+
+    def skills_at(self, min_score: int = 90) -> List[str]:
+        """extract_skills() for this document, kept per threshold and skills-map version."""
+        from .skills import current_skills, extract_skills
+        key = (min_score, current_skills().version)
+        if key not in self._skills:
+            self._skills[key] = extract_skills(self.tokens, min_score, text=self.text)
+        return self._skills[key]
+
+    @property
+    def skills(self) -> List[str]:
+        return self.skills_at()
+
+
+def section_map(doc_or_sections):
+    """The sections mapping of a ResumeDocument; anything else is returned unchanged."""
+    return doc_or_sections.sections if isinstance(doc_or_sections, ResumeDocument) else doc_or_sections
@@ -0,0 +1,123 @@
+# app/ai/fuzzy.py
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import threading
+
+from rapidfuzz import process, fuzz
+
+
+def _depth(n: int, min_score: float) -> int:
+    """
+    Most characters a word of length n can lose on its own side of a match with
+    fuzz.ratio >= min_score. With x/y deletions on each side to reach the common
+    subsequence, ratio = 100 * (1 - (x + y) / (2n - x + y)); solving for y = 0 gives
+    x <= 2n(100 - s) / (200 - s).
+    """
+    return int(2 * n * (100 - min_score) / (200 - min_score) + 1e-9)
+
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    """`word` plus every string reachable by removing up to `depth` characters."""
+    n = len(word)
+    out = {word}
+    if depth >= 1:
+        out.update(word[:i] + word[i + 1:] for i in range(n))
+    if depth >= 2:
+        out.update(word[:i] + word[i + 1:j] + word[j + 1:] for i in range(n) for j in range(i + 1, n))
+    frontier = out
+    for _ in range(depth - 2):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out = out | frontier
+    return out
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion dictionary over the skill vocabulary, used by the typo
+    pass of extract_skills (one process-wide index per threshold, see
+    SkillsMap.fuzzy_index). Answers "which skills score fuzz.ratio >= min_score
+    against this resume token" by looking up the token's deletion variants instead
+    of scoring it against every skill, then confirms candidates with fuzz.ratio.
+    Results are identical to a brute-force rapidfuzz scan. (ATS coverage does not use
+    it: one JD against one resume is a single cdist call, see ats.coverage.)
+
+    The dictionary costs roughly `build_after` scored pairs per word to build, so it is
+    built lazily: until queries have scanned that many pairs, lookups stay a plain
+    rapidfuzz scan. `memo_size` remembers answers for recurring tokens.
+    """
+
+    def __init__(self, words: Iterable[str], min_score: float = 90, max_depth: int = 2,
+                 build_after: int = 200, memo_size: int = 0):
+        self.min_score = min_score
+        self.max_depth = max_depth
+        self.words: Set[str] = set(words)
+        self._scan = list(self.words)  # rapidfuzz iterates lists faster than sets
+        self._index: Optional[Dict[str, Tuple[str, ...]]] = None  # deletion variant -> words
+        self._deep: List[str] = []  # words too long to index within max_depth; scanned directly
+        self._deep_lens: List[int] = []
+        self._budget = build_after * len(self.words) if min_score > 0 else float("inf")
+        self._memo: Dict[str, List[str]] = {}
+        self._memo_size = memo_size
+        self._build_lock = threading.Lock()  # shared indexes are queried from worker threads
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _build(self) -> None:
+        with self._build_lock:
+            if self._index is not None:
+                return
+            index: Dict[str, Tuple[str, ...]] = {}
+            deep: List[str] = []
+            for w in self.words:
+                d = _depth(len(w), self.min_score)
+                if d > self.max_depth:
+                    deep.append(w)
+                    continue
+                for v in _deletes(w, d):
+                    # tuples, not lists: a few thousand tiny lists per build is measurably slower
+                    index[v] = index.get(v, ()) + (w,)
+            deep.sort(key=len)
+            self._deep, self._deep_lens = deep, [len(w) for w in deep]
+            self._index = index
+
+    def _candidates(self, term: str) -> Iterable[str]:
+        if self._index is None:
+            self._budget -= len(self.words)
+            if self._budget > 0:
+                return self._scan
+            self._build()
+        d = _depth(len(term), self.min_score)
+        if d > self.max_depth:
+            return self._scan
+        # long words skipped by _build: only those whose length is compatible can score high
+        # enough, since |n - m| <= indel <= f * (n + m)
+        n, f = len(term), (100 - self.min_score) / 100
+        lo = bisect_left(self._deep_lens, n * (1 - f) / (1 + f) - 1e-9)
+        hi = bisect_right(self._deep_lens, n * (1 + f) / (1 - f) + 1e-9)
+        cands: Set[str] = set(self._deep[lo:hi])
+        index = self._index
+        for v in _deletes(term, d):
+            if v in index:
+                cands.update(index[v])
+        return cands
+
+    def matches(self, term: str) -> List[str]:
+        """All indexed words with fuzz.ratio(term, word) >= min_score."""
+        # one lookup: another thread may clear the memo between a membership test and a read
+        hit = self._memo.get(term)
+        if hit is not None:
+            return hit
+        cands = self._candidates(term)
+        if cands is self._scan:
+            # no score_cutoff: rapidfuzz's unfiltered ratio scan is the faster path here
+            found = [w for w, sc, _ in process.extract(term, cands, scorer=fuzz.ratio, limit=None)
+                     if sc >= self.min_score]
+        else:
+            found = [w for w in cands if fuzz.ratio(term, w) >= self.min_score]
+        if self._memo_size:
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[term] = found
+        return found
@@ -0,0 +1,57 @@
+# app/ai/matcher.py
+from __future__ import annotations
+import re
+from typing import Dict, Iterable, List, Set
+
+# a phrase must start/end on a word edge; "+"/"#" count as word chars after a match
+# so "c" never fires inside "c++" and "embedded c" never fires inside "embedded c++"
+_BEFORE = r"(?<![a-z0-9])"
+_AFTER = r"(?![a-z0-9+#])"
+
+
+def _trie_regex(node: dict) -> str:
+    """Render a char trie as a regex; longer continuations are tried first (greedy)."""
+    branches, terminal = [], "" in node
+    for ch in sorted(k for k in node if k):
+        branches.append(re.escape(ch) + _trie_regex(node[ch]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if terminal else body
+
+
+class PhraseMatcher:
+    """
+    Finds every known phrase ("python", "computer vision", "next.js", "c++") in a
+    single left-to-right scan. The phrase list is compiled once into a trie-shaped
+    regex, so cost grows with the text length, not with the number of phrases.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        # single letters ("r") are too ambiguous in free text (initials, "R&D")
+        self.phrases: List[str] = sorted({p.strip().lower() for p in phrases if len(p.strip()) > 1})
+        trie: dict = {}
+        for p in self.phrases:
+            node = trie
+            for ch in p:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        # zero-width lookahead so a match at one word start never hides one at the next
+        self._rx = re.compile(f"{_BEFORE}(?=({_trie_regex(trie)}){_AFTER})") if trie else None
+
+        # the regex reports the longest phrase per start; also credit shorter phrases that
+        # end on a word edge inside it ("react" inside "react native", "node" in "node.js")
+        known = set(self.phrases)
+        self._prefixes: Dict[str, List[str]] = {}
+        for p in self.phrases:
+            self._prefixes[p] = [p[:i] for i in range(2, len(p))
+                                 if p[:i] in known and not re.match(r"[a-z0-9+#]", p[i])] + [p]
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of phrases occurring in `text` (case-insensitive)."""
+        if not self._rx or not text:
+            return set()
+        found: Set[str] = set()
+        for m in self._rx.finditer(text.lower()):
+            found.update(self._prefixes[m.group(1)])
+        return found
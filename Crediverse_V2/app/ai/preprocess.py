@@ -1,28 +1,16 @@
-import nltk
-from nltk.data import find
-
-def _ensure_nltk():
-    try:
-        find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-    try:
-        find('tokenizers/punkt_tab')
-    except LookupError:
-        nltk.download('punkt_tab')
-    try:
-        find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords')
-
-_ensure_nltk()
+import re, unicodedata
+from collections.abc import MutableMapping
+from functools import lru_cache
+from pathlib import Path
 
+from app import config
 
-import re, unicodedata
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+# bump when sectionize()/tokens() output changes; part of the extraction cache key
+# (the backend name is included: the two backends split text slightly differently)
+TOKENIZER_VERSION = f"3-{config.TOKENIZER}"
 
-_STOP = set(stopwords.words("english"))
+# NLTK's English list, bundled so nothing is fetched at runtime
+_STOP = frozenset(Path(__file__).with_name("stopwords_en.txt").read_text(encoding="utf-8").split())
 
 SECTION_PATTERNS = {
     "summary": r"(summary|objective)\b",
@@ -33,29 +21,147 @@ SECTION_PATTERNS = {
     "achievements": r"\bachievements?\b",
 }
 
+# runs of 2+ spaces/tabs, or any tab; a lone space is left alone instead of being rewritten
+_BLANKS = re.compile(r" [ \t]+|\t[ \t]*")
+
 def normalize_text(t: str) -> str:
     t = unicodedata.normalize("NFKC", t or "")
-    t = re.sub(r"[ \t]+", " ", t)
+    t = "\n".join(t.splitlines())  # every line break splitlines() honours becomes "\n"
+    t = _BLANKS.sub(" ", t)
     return t.strip()
 
-def sectionize(text: str):
-    text = normalize_text(text)
-    lines = text.splitlines()
-    out = {"__full__": text}
-    current = "other"; buf = []
-    def flush():
-        if buf:
-            out[current] = (out.get(current,"") + "\n" + "\n".join(buf)).strip()
-    for ln in lines:
-        low = ln.lower().strip()
-        header = next((k for k,pat in SECTION_PATTERNS.items() if re.search(pat, low)), None)
-        if header:
-            flush(); current = header; buf = [ln]
-        else:
-            buf.append(ln)
-    flush()
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+def _compile_headers(flags: int = 0):
+    # Each pattern is compiled once and scans the whole text in one C-level pass. (One
+    # alternation of all six measured ~2x slower: re only skips ahead quickly through text
+    # for a single pattern that starts with a literal.) A leading \b defeats that skip, so
+    # it is dropped from the regex and checked on the few hits instead.
+    out = []
+    for k, pat in SECTION_PATTERNS.items():
+        lead = pat.startswith(r"\b")
+        out.append((k, re.compile(pat[2:] if lead else pat, flags), lead))
     return out
 
+_HEADERS = _compile_headers()
+
+@lru_cache(maxsize=1)
+def _headers_ignorecase():
+    return _compile_headers(re.IGNORECASE)
+
+def _header_lines(text: str):
+    """[(line start offset, section)] for every header line; on a line naming two
+    sections the one listed first in SECTION_PATTERNS wins."""
+    low, headers = text.lower(), _HEADERS
+    if len(low) != len(text):  # a few case mappings change length; offsets must line up
+        low, headers = text, _headers_ignorecase()
+    found = {}
+    for name, rx, lead in headers:
+        for m in rx.finditer(low):
+            i = m.start()
+            if lead and (i > 0 and _is_word(low[i - 1])) == (i < len(low) and _is_word(low[i])):
+                continue  # no word boundary before the hit
+            if "\n" not in m.group():
+                found.setdefault(low.rfind("\n", 0, i) + 1, name)
+    return sorted(found.items())
+
+class Sections(MutableMapping):
+    """
+    sectionize() result: {"__full__": text, "<section>": text, ...}. Sections are kept
+    as (start, end) offsets into the full text and sliced out only when read; extra
+    keys (e.g. "__page_count__") can be set like on a dict.
+    """
+
+    def __init__(self, text: str, spans: dict, extra: dict | None = None):
+        self.text = text
+        self.spans = spans  # name -> [(start, end), ...] in document order
+        self._extra = dict(extra or {})
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key == "__full__":
+            return self.text
+        if key not in self._values:
+            acc = ""
+            for start, end in self.spans[key]:  # raises KeyError for unknown sections
+                acc = (acc + "\n" + self.text[start:end]).strip()
+            self._values[key] = acc
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._extra:
+            del self._extra[key]
+        else:
+            del self.spans[key]
+            self._values.pop(key, None)
+
+    def __iter__(self):
+        yield "__full__"
+        yield from self.spans
+        yield from (k for k in self._extra if k != "__full__" and k not in self.spans)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Sections({list(self)})"
+
+    def to_json(self) -> dict:
+        return {"text": self.text, "spans": self.spans, "extra": self._extra}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Sections":
+        return cls(d["text"], {k: [tuple(s) for s in v] for k, v in d["spans"].items()}, d.get("extra"))
+
+
+def sectionize(text: str) -> Sections:
+    text = normalize_text(text)
+    spans: dict = {}
+    current, start = "other", 0
+    for pos, name in _header_lines(text):
+        if pos > 0:  # lines before the first header, or the previous section
+            spans.setdefault(current, []).append((start, pos - 1))
+        current, start = name, pos
+    if text:
+        spans.setdefault(current, []).append((start, len(text)))
+    return Sections(text, spans)
+
+# --- Tokenizer backends: text -> candidate words (alphabetic tokens are kept) ---
+
+# a word plus anything glued to it by - ' or . ("scikit-learn", "don't", "node.js"), so
+# like NLTK's word_tokenize these come out whole and fail the alphabetic filter
+_WORD = re.compile(r"\w+(?:[-'.]\w+)*")
+
+def _regex_words(text: str):
+    return _WORD.findall(text)
+
+@lru_cache(maxsize=None)
+def _ensure_nltk():
+    # opt-in backend only: resolved (and, if missing, downloaded) on first use, never at import
+    import nltk
+    from nltk.data import find
+    for res, name in (("tokenizers/punkt", "punkt"), ("tokenizers/punkt_tab", "punkt_tab")):
+        try:
+            find(res)
+        except LookupError:
+            nltk.download(name)
+
+def _nltk_words(text: str):
+    _ensure_nltk()
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
+
+TOKENIZERS = {"regex": _regex_words, "nltk": _nltk_words}
+if config.TOKENIZER not in TOKENIZERS:
+    raise ValueError(f"TOKENIZER must be one of {sorted(TOKENIZERS)}, not {config.TOKENIZER!r}")
+_words = TOKENIZERS[config.TOKENIZER]
+
 def tokens(text: str):
-    toks = [w.lower() for w in word_tokenize(text or "") if w.isalpha()]
+    toks = [w.lower() for w in _words(text or "") if w.isalpha()]
     return [w for w in toks if w not in _STOP and len(w) > 2]
@@ -1,4 +1,8 @@
-def score_resume(section_map: dict) -> tuple[int, list[tuple[str,bool,int]]]:
+from .document import section_map as _sections
+
+def score_resume(section_map) -> tuple[int, list[tuple[str,bool,int]]]:
+    """`section_map` is a sectionize() result or a ResumeDocument."""
+    section_map = _sections(section_map)
     rules = [
         ("summary",     15),
         ("experience",  25),
@@ -1,4 +1,15 @@
-from rapidfuzz import process, fuzz
+from pathlib import Path
+from functools import cached_property
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from .fuzzy import FuzzyIndex
+from .matcher import PhraseMatcher
+from .document import ResumeDocument
 
 SKILL_BANK = {
     "programming": ["python","java","c++","javascript","typescript","sql","bash","powershell"],
@@ -8,18 +19,129 @@ SKILL_BANK = {
     "cloud": ["aws","gcp","azure","docker","kubernetes","git","linux","ci/cd"],
     "uiux": ["figma","adobe xd","wireframing","prototyping","usability testing"],
 }
-CANON = sorted({s for lst in SKILL_BANK.values() for s in lst})
-
-def extract_skills(tokens, min_score=90):
-    found = set()
-    low = set(tokens)
-    for s in CANON:
-        if s in low:
-            found.add(s)
-        else:
-            match = process.extractOne(s, low, scorer=fuzz.ratio)
-            if match and match[1] >= min_score:
-                found.add(s)
+
+SKILLS_MAP_PATH = Path(__file__).with_name("skills_map.json")
+
+
+class SkillsMap:
+    """
+    One immutable snapshot of skills_map.json: lowercase skill sets per track, the
+    skill -> tracks reverse map, and (built on first use) the phrase matcher and fuzzy
+    index over SKILL_BANK plus every mapped skill. `version` changes whenever the file
+    content does, so caches can key on it.
+    """
+
+    def __init__(self, raw: dict, version: str):
+        self.raw = raw
+        self.version = version
+        self.tracks = {t: frozenset(s.lower() for s in lst) for t, lst in raw.items()}
+        reverse: dict = {}
+        for t, skills in self.tracks.items():
+            for s in skills:
+                reverse.setdefault(s, []).append(t)
+        self.skill_tracks = {s: tuple(ts) for s, ts in reverse.items()}
+        self._indexes: dict = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def canon(self) -> list:
+        # SKILL_BANK plus every skill named in the map, so track scoring can see them
+        return sorted({s for lst in SKILL_BANK.values() for s in lst} | set(self.skill_tracks))
+
+    @cached_property
+    def matcher(self) -> PhraseMatcher:
+        return PhraseMatcher(self.canon)
+
+    @cached_property
+    def track_matrix(self):
+        """(skill -> column id, tracks x skills binary CSR) for batch scoring."""
+        skill_id = {s: j for j, s in enumerate(sorted(self.skill_tracks))}
+        rows, cols = [], []
+        for t, skills in enumerate(self.tracks.values()):
+            rows.extend([t] * len(skills))
+            cols.extend(skill_id[s] for s in skills)
+        m = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                              shape=(len(self.tracks), len(skill_id)))
+        return skill_id, m
+
+    def fuzzy_index(self, min_score: float) -> FuzzyIndex:
+        with self._lock:
+            if min_score not in self._indexes:
+                # resume vocabularies overlap heavily, so remember per-token answers
+                self._indexes[min_score] = FuzzyIndex(self.canon, min_score, memo_size=100_000)
+            return self._indexes[min_score]
+
+
+class SkillsRegistry:
+    """
+    Process-wide skills map. The file is read once; afterwards its mtime is checked at
+    most every `check_every` seconds and a changed file is loaded into a fresh snapshot
+    that replaces the old one in a single assignment, so readers never see a mix.
+    """
+
+    def __init__(self, path: str | Path = SKILLS_MAP_PATH, check_every: float = 1.0):
+        self.path = Path(path)
+        self.check_every = check_every
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._snap = self._load()
+
+    def _load(self) -> SkillsMap:
+        try:
+            self._mtime = os.stat(self.path).st_mtime_ns
+            data = self.path.read_bytes()
+            return SkillsMap(json.loads(data), hashlib.sha256(data).hexdigest()[:12])
+        except Exception:
+            self._mtime = None
+            return SkillsMap(_DEFAULT_MAP, "default")
+
+    def current(self) -> SkillsMap:
+        now = time.monotonic()
+        if now - self._checked >= self.check_every:
+            with self._lock:
+                if now - self._checked >= self.check_every:
+                    self._checked = now
+                    try:
+                        mtime = os.stat(self.path).st_mtime_ns
+                    except OSError:
+                        mtime = None
+                    if mtime != self._mtime:
+                        self._snap = self._load()
+        return self._snap
+
+    @property
+    def version(self) -> str:
+        return self.current().version
+
+
+_registry: SkillsRegistry | None = None
+
+def skills_registry() -> SkillsRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SkillsRegistry()
+    return _registry
+
+def current_skills() -> SkillsMap:
+    """The live skills snapshot (reloaded when skills_map.json changes)."""
+    return skills_registry().current()
+
+def extract_skills(tokens, min_score=90, text: str | None = None):
+    """
+    Skills found in a resume. Exact phrases ("computer vision", "next.js", "c++") come
+    from one pass of the compiled matcher over `text` (or the joined tokens); skills
+    still missing get typo tolerance (fuzz.ratio >= min_score) from a deletion index over
+    the skill list, so each resume token costs a few dict lookups.
+    `tokens` may also be a ResumeDocument, which computes this once and keeps it.
+    """
+    if isinstance(tokens, ResumeDocument):
+        return tokens.skills_at(min_score)
+    snap = current_skills()
+    found = snap.matcher.find(text if text is not None else " ".join(tokens))
+    index = snap.fuzzy_index(min_score)
+    for tok in set(tokens):
+        found.update(index.matches(tok))
     return sorted(found)
 
 def infer_track(skills):
@@ -30,8 +152,16 @@ def infer_track(skills):
     return "General Software"
 
 # --- Track scoring (map-driven) ---
-from pathlib import Path
-import json
+
+# fallback minimal map
+_DEFAULT_MAP = {
+    "Web Development": ["react","node","django","flask","javascript","html","css","nextjs"],
+    "Data Science": ["pandas","numpy","scikit-learn","matplotlib","seaborn","sql"],
+    "AI/ML": ["tensorflow","pytorch","nlp","cv","llm","transformers"],
+    "Cloud/DevOps": ["aws","gcp","azure","docker","kubernetes","terraform"],
+    "Mobile": ["android","kotlin","flutter","swift"],
+    "UI/UX": ["figma","wireframing","prototyping"]
+}
 
 def load_skills_map(path: str | Path) -> dict:
     """Load a skills→track map from JSON; if not found, return a safe default."""
@@ -39,32 +169,87 @@ def load_skills_map(path: str | Path) -> dict:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception:
-        # fallback minimal map
-        return {
-            "Web Development": ["react","node","django","flask","javascript","html","css","nextjs"],
-            "Data Science": ["pandas","numpy","scikit-learn","matplotlib","seaborn","sql"],
-            "AI/ML": ["tensorflow","pytorch","nlp","cv","llm","transformers"],
-            "Cloud/DevOps": ["aws","gcp","azure","docker","kubernetes","terraform"],
-            "Mobile": ["android","kotlin","flutter","swift"],
-            "UI/UX": ["figma","wireframing","prototyping"]
-        }
-
-def score_tracks(detected_skills: list[str], skills_map: dict) -> list[tuple[str, int, list[str]]]:
+        return dict(_DEFAULT_MAP)
+
+def score_tracks(detected_skills: list[str], skills_map) -> list[tuple[str, int, list[str]]]:
     """
     Return list of (track, score, matched_skills) sorted by score desc.
     Score = number of overlaps between detected_skills and track's canonical list.
+    `skills_map` is a SkillsMap snapshot (precomputed sets) or a plain track→skills dict.
     """
-    low = {s.lower() for s in detected_skills}
-    scored: list[tuple[str,int,list[str]]] = []
-    for track, canon in skills_map.items():
-        canon_low = [c.lower() for c in canon]
-        matched = sorted(low.intersection(canon_low))
-        scored.append((track, len(matched), matched))
+    if not isinstance(skills_map, SkillsMap):
+        skills_map = SkillsMap(skills_map, "")
+    matched: dict = {t: [] for t in skills_map.tracks}
+    for s in {s.lower() for s in detected_skills}:
+        for t in skills_map.skill_tracks.get(s, ()):
+            matched[t].append(s)
+    scored = [(t, len(m), sorted(m)) for t, m in matched.items()]
     scored.sort(key=lambda x: x[1], reverse=True)
     return scored
 
-def top_tracks(detected_skills: list[str], skills_map: dict, k: int = 3) -> list[tuple[str, int, list[str]]]:
+def top_tracks(detected_skills: list[str], skills_map, k: int = 3) -> list[tuple[str, int, list[str]]]:
     return score_tracks(detected_skills, skills_map)[:k]
+
+class TrackScores:
+    """
+    Result of top_tracks_many(): `scores[i, t]` is resume i's overlap with track t and
+    `top_ids[i]` its best k track indices. top(i) equals top_tracks() for resume i;
+    matched-skill lists are only built when asked for.
+    """
+
+    def __init__(self, skills_map: SkillsMap, skill_lists, scores, top_ids):
+        self.tracks = list(skills_map.tracks)
+        self.scores: np.ndarray = scores
+        self.top_ids: np.ndarray = top_ids
+        self._lists = skill_lists
+        self._map = skills_map
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.scores.shape
+
+    def top(self, i: int) -> list[tuple[str, int, list[str]]]:
+        low = {s.lower() for s in self._lists[i]}
+        out = []
+        for t in self.top_ids[i]:
+            track = self.tracks[t]
+            out.append((track, int(self.scores[i, t]), sorted(low & self._map.tracks[track])))
+        return out
+
+def top_tracks_many(skill_lists, skills_map=None, k: int = 3) -> TrackScores:
+    """
+    top_tracks() for many resumes at once: skill sets become rows of a sparse resume x
+    skill matrix, one product with the track x skill matrix gives every overlap count,
+    and argpartition picks each row's top k. Ties rank in skills_map order, as in
+    score_tracks().
+    """
+    if skills_map is None:
+        skills_map = current_skills()
+    elif not isinstance(skills_map, SkillsMap):
+        skills_map = SkillsMap(skills_map, "")
+    skill_id, m = skills_map.track_matrix
+    skill_lists = list(skill_lists)
+    # one flat pass: skill ids (case-folded only when the exact string is unknown) + row ids
+    get = skill_id.get
+    flat = [get(s) if s in skill_id else get(s.lower(), -1) for lst in skill_lists for s in lst]
+    cols = np.array(flat, dtype=np.int64)
+    rows = np.repeat(np.arange(len(skill_lists)), [len(lst) for lst in skill_lists])
+    keep = cols >= 0
+    r = sparse.csr_matrix((np.ones(int(keep.sum()), dtype=np.float32), (rows[keep], cols[keep])),
+                          shape=(len(skill_lists), m.shape[1]))
+    r.data[:] = 1  # a skill listed twice (or in two cases) still counts once
+    scores = (r @ m.T).toarray().astype(np.int32)
+
+    n_tracks = m.shape[0]
+    k = max(0, min(k, n_tracks))
+    # unique per row: score first, then earlier track, matching the stable sort
+    key = scores.astype(np.int64) * n_tracks + (n_tracks - 1 - np.arange(n_tracks))
+    if 0 < k < n_tracks:
+        part = np.argpartition(-key, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n_tracks), key.shape)[:, :k]
+    order = np.argsort(-np.take_along_axis(key, part, axis=1), axis=1)
+    return TrackScores(skills_map, skill_lists, scores, np.take_along_axis(part, order, axis=1))
 from typing import List, Dict
 from collections import defaultdict
 import re
@@ -1,4 +1,8 @@
-def suggestions(section_map: dict, skills_found: list, missing_keywords: list):
+from .document import section_map as _sections
+
+def suggestions(section_map, skills_found: list, missing_keywords: list):
+    """`section_map` is a sectionize() result or a ResumeDocument."""
+    section_map = _sections(section_map)
     msgs = []
     if not section_map.get("summary"):
         msgs.append("Add a brief **Summary/Objective** with your target role and 2–3 achievements.")
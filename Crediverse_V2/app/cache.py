@@ -0,0 +1,124 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from app import config
+from app.parsing import PARSER_VERSION
+from app.ai.preprocess import TOKENIZER_VERSION
+from app.sqlite_store import SQLiteStore, process_wide
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries(
+    key     TEXT PRIMARY KEY,          -- "<sha256>:<version>"
+    value   BLOB NOT NULL,             -- zlib(json)
+    size    INTEGER NOT NULL,
+    atime   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_atime ON entries(atime);
+CREATE TABLE IF NOT EXISTS stats(
+    k       TEXT PRIMARY KEY,
+    v       INTEGER NOT NULL
+);
+"""
+
+
+class ExtractionCache(SQLiteStore):
+    """
+    Content-addressed cache for extraction results (text, sections, tokens).
+
+    Keys are the sha256 of the uploaded bytes plus a version string, so a parser or
+    tokenizer change simply stops matching old entries. Lookups hit a per-process LRU
+    first, then a SQLite store shared by every process; the store evicts least
+    recently used entries once it grows past `max_bytes`.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(self, path: str | Path, version: str, max_bytes: int, mem_items: int = 256):
+        self.version = version
+        self.max_bytes = max_bytes
+        self.mem_items = mem_items
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        super().__init__(path)
+
+    def _key(self, sha: str) -> str:
+        return f"{sha}:{self.version}"
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._mem[key] = value
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.mem_items:
+                self._mem.popitem(last=False)
+
+    def get(self, sha: str) -> Optional[Dict[str, Any]]:
+        key = self._key(sha)
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM entries WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE entries SET atime=? WHERE key=?", (time.time(), key))
+        finally:
+            conn.close()
+        value = json.loads(zlib.decompress(row[0]))
+        self._remember(key, value)
+        return value
+
+    def put(self, sha: str, value: Dict[str, Any]) -> None:
+        key = self._key(sha)
+        blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        self._remember(key, value)
+        conn = self._connect()
+        try:
+            with conn:
+                old = conn.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO entries(key, value, size, atime) VALUES (?,?,?,?)",
+                             (key, blob, len(blob), time.time()))
+                total = self._grow(conn, len(blob) - (old[0] if old else 0))
+                if total > self.max_bytes:
+                    self._evict(conn, total - int(self.max_bytes * 0.9))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _grow(conn: sqlite3.Connection, delta: int) -> int:
+        """Adjust the running byte total (kept in `stats`, not re-summed) and return it."""
+        conn.execute("INSERT INTO stats(k, v) VALUES ('bytes', ?) "
+                     "ON CONFLICT(k) DO UPDATE SET v = v + excluded.v", (delta,))
+        return conn.execute("SELECT v FROM stats WHERE k='bytes'").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, need: int) -> None:
+        """Drop least recently used entries until `need` bytes are freed."""
+        doomed, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY atime"):
+            if freed >= need:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM entries WHERE key=?", doomed)
+        self._grow(conn, -freed)
+
+
+@process_wide
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Process-wide cache at config.CACHE_PATH, versioned by parser + tokenizer and by the
+    PDF page cap, since the extracted text stops at MAX_PDF_PAGES.
+    """
+    return ExtractionCache(config.CACHE_PATH,
+                           f"p{PARSER_VERSION}-t{TOKENIZER_VERSION}-c{config.MAX_PDF_PAGES}",
+                           max_bytes=config.CACHE_MAX_MB * 1024 * 1024,
+                           mem_items=config.CACHE_MEM_ITEMS)
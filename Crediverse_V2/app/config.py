@@ -7,9 +7,67 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 UPLOAD_DIR = (BASE_DIR / "Uploaded_Resumes").resolve()
 LOGO_PATH = (BASE_DIR / "Logo" / "Crediverse_ResumeAnalyzer.png").resolve()
 LOGS_DIR = (BASE_DIR / "logs").resolve()
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data")).resolve()
 
 MAX_FILE_MB = int(os.getenv("MAX_FILE_MB", "10"))
+# PDF pages parsed per upload (0 = no cap); the full page count is still reported
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+# room for form fields (JD text) and multipart framing on top of the files in a request
+MAX_FORM_MB = int(os.getenv("MAX_FORM_MB", "1"))
 ALLOWED_EXT = {".pdf", ".docx"}
+# keep a copy of API uploads in UPLOAD_DIR (written after the response; analysis never needs it)
+PERSIST_UPLOADS = os.getenv("PERSIST_UPLOADS", "0") == "1"
+
+# batch analysis (/analyze/batch)
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "50"))
+
+# API analysis runs off the event loop in a bounded pool: "process" or "thread" workers,
+# plus at most ANALYZE_QUEUE waiting files; beyond that requests get 503 + Retry-After
+ANALYZE_EXECUTOR = os.getenv("ANALYZE_EXECUTOR", "process")
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str(os.cpu_count() or 2)))
+ANALYZE_QUEUE = int(os.getenv("ANALYZE_QUEUE", "64"))
+RETRY_AFTER_S = int(os.getenv("RETRY_AFTER_S", "5"))
+
+# tokenizer backend for preprocess.tokens: "regex" (default, no downloads) or "nltk"
+TOKENIZER = os.getenv("TOKENIZER", "regex")
+
+# BM25 candidate index (/search), filled as resumes are analyzed
+INDEX_PATH = Path(os.getenv("INDEX_PATH", DATA_DIR / "resume_index.sqlite3"))
+
+# async jobs (POST /jobs): durable SQLite queue drained by JOB_WORKERS threads feeding the
+# analysis pool; a running job whose worker died is retried after JOB_LEASE_S
+JOBS_PATH = Path(os.getenv("JOBS_PATH", DATA_DIR / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "10000"))
+JOB_LEASE_S = int(os.getenv("JOB_LEASE_S", "300"))
+JOB_RETENTION_H = int(os.getenv("JOB_RETENTION_H", "168"))
+
+# manifest of files saved to UPLOAD_DIR (what the Admin Uploads tab lists)
+MANIFEST_PATH = Path(os.getenv("MANIFEST_PATH", DATA_DIR / "uploads.sqlite3"))
+
+# extraction cache keyed by upload sha256 (in-memory LRU over a size-capped SQLite store)
+CACHE_PATH = Path(os.getenv("CACHE_PATH", DATA_DIR / "extract_cache.sqlite3"))
+CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "512"))
+CACHE_MEM_ITEMS = int(os.getenv("CACHE_MEM_ITEMS", "256"))
+
+# Streamlit analysis rows are written behind the request: batched every DB_WRITE_BATCH rows
+# or DB_FLUSH_S seconds; batches that keep failing go to DB_SPILL_PATH and are replayed later
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "200"))
+DB_FLUSH_S = float(os.getenv("DB_FLUSH_S", "2"))
+DB_WRITE_QUEUE = int(os.getenv("DB_WRITE_QUEUE", "10000"))
+DB_SPILL_PATH = Path(os.getenv("DB_SPILL_PATH", DATA_DIR / "pending_rows.jsonl"))
+# Admin dashboard aggregates are cached this long (seconds)
+DASHBOARD_TTL_S = int(os.getenv("DASHBOARD_TTL_S", "30"))
+# where the Streamlit app links to the API (CSV export)
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000").rstrip("/")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+# PDF previews: "api" = iframe loads a signed /uploads URL from the API (must be reachable
+# from the browser at API_BASE_URL); "inline" = the old base64 data URI. Defaults to "api"
+# only when API_BASE_URL is set, so a plain `streamlit run` still shows previews
+PDF_PREVIEW = os.getenv("PDF_PREVIEW", "api" if os.getenv("API_BASE_URL") else "inline")
+PREVIEW_TTL_S = int(os.getenv("PREVIEW_TTL_S", "3600"))
+PREVIEW_SECRET = os.getenv("PREVIEW_SECRET", "")   # empty: a random key stored in DATA_DIR
 
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
+DATA_DIR.mkdir(parents=True, exist_ok=True)
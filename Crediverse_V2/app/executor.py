@@ -0,0 +1,114 @@
+from __future__ import annotations
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import multiprocessing
+import threading
+
+
+class Overloaded(Exception):
+    """Raised by BoundedExecutor when accepting the work would exceed its queue bound."""
+
+
+def _default_start_method() -> str:
+    # forking a process that already runs threads (uvicorn, the write-behind writer) can
+    # copy a held lock into the child; forkserver/spawn start workers from a clean process
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class BoundedExecutor:
+    """
+    Thread or process pool with admission control. At most `workers + max_queue`
+    calls are in flight (running or waiting); submitting beyond that raises
+    Overloaded right away instead of letting the backlog, and every caller's
+    latency, grow without limit.
+
+    When a worker process dies (killed for memory, a crash in a native parser) the
+    pool is broken: the calls it was holding fail with BrokenProcessPool, and the
+    pool is replaced so later calls, and the rest of a batch being submitted, run
+    on fresh workers.
+    """
+
+    def __init__(self, kind: str = "process", workers: int = 2, max_queue: int = 32,
+                 start_method: Optional[str] = None):
+        if kind not in {"process", "thread"}:
+            raise ValueError(f"executor kind must be 'process' or 'thread', not {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_queue)
+        self.start_method = start_method or _default_start_method()
+        self._in_flight = 0
+        self._restarts = 0
+        self._lock = threading.Lock()
+        self._pool: Executor = self._new_pool()
+
+    def _new_pool(self) -> Executor:
+        if self.kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers)
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context(self.start_method))
+
+    def _replace(self, broken: Executor) -> Executor:
+        """Swap in a fresh pool if `broken` is still the current one; returns the current pool."""
+        with self._lock:
+            if self._pool is broken:
+                self._pool = self._new_pool()
+                self._restarts += 1
+            else:
+                broken = None
+            pool = self._pool
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        return pool
+
+    def _done(self, pool: Executor, fut: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        if not fut.cancelled() and isinstance(fut.exception(), BrokenExecutor):
+            self._replace(pool)
+
+    def _submit_one(self, fn: Callable, args: tuple) -> Future:
+        pool = self._pool
+        try:
+            fut = pool.submit(fn, *args)
+        except BrokenExecutor:
+            pool = self._replace(pool)
+            fut = pool.submit(fn, *args)
+        fut.add_done_callback(partial(self._done, pool))
+        return fut
+
+    def submit_all(self, calls: Sequence[Tuple[Callable, tuple]]) -> List[Future]:
+        """Admit every (fn, args) call or none of them (a batch never half-starts)."""
+        with self._lock:
+            if self._in_flight + len(calls) > self.capacity:
+                raise Overloaded(f"{self._in_flight} of {self.capacity} slots busy; "
+                                 f"{len(calls)} more requested")
+            self._in_flight += len(calls)
+        futures = []
+        try:
+            for fn, args in calls:
+                futures.append(self._submit_one(fn, args))
+        except Exception:
+            with self._lock:
+                self._in_flight -= len(calls) - len(futures)
+            for fut in futures:
+                fut.cancel()
+            raise
+        return futures
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        return self.submit_all([(fn, args)])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        in_flight = self._in_flight
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            "restarts": self._restarts,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from app import config
+from app.sqlite_store import SQLiteStore, process_wide
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs(
+    id          TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,             -- queued | running | done | failed
+    filename    TEXT,
+    ext         TEXT NOT NULL,
+    jd          TEXT,
+    sha         TEXT NOT NULL,             -- sha256 of the upload
+    size_mb     REAL NOT NULL,
+    payload     BLOB,                      -- upload bytes; dropped once the job finishes
+    result      TEXT,                      -- AnalyzeResponse as JSON
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,                      -- a running job past this is presumed lost
+    created     REAL NOT NULL,
+    started     REAL,
+    finished    REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created);
+"""
+
+_FINAL = ("done", "failed")
+
+
+class JobQueue(SQLiteStore):
+    """
+    Durable FIFO of analysis jobs in SQLite. Uploads are stored with the job, so
+    anything queued or running survives a restart. A worker claims a job with a lease;
+    a running job whose lease expired (its worker died) is claimed again, up to
+    `max_attempts` times. Claims are single UPDATE statements, so several processes
+    can share one queue file.
+    """
+
+    schema = _SCHEMA
+    row_factory = sqlite3.Row
+
+    def __init__(self, path: str | Path, lease_s: float = 600, max_attempts: int = 3):
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        super().__init__(path)
+
+    def enqueue(self, data: bytes, ext: str, filename: str, jd: Optional[str], sha: str) -> str:
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO jobs(id, status, filename, ext, jd, sha, size_mb, payload, created) "
+                             "VALUES (?,?,?,?,?,?,?,?,?)",
+                             (job_id, "queued", filename, ext, jd, sha, len(data) / 1024 / 1024, data, time.time()))
+        finally:
+            conn.close()
+        return job_id
+
+    def claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest runnable job (queued, or running with an expired lease)."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                # jobs that keep killing their worker are given up on
+                conn.execute("UPDATE jobs SET status='failed', error='Gave up after repeated worker failures', "
+                             "payload=NULL, finished=? WHERE status='running' AND lease_until < ? AND attempts >= ?",
+                             (now, now, self.max_attempts))
+                return conn.execute(
+                    "UPDATE jobs SET status='running', attempts=attempts+1, lease_until=?, started=? "
+                    "WHERE id = (SELECT id FROM jobs WHERE status='queued' "
+                    "            OR (status='running' AND lease_until < ?) ORDER BY created LIMIT 1) "
+                    "RETURNING id, filename, ext, jd, sha, size_mb, payload",
+                    (now + self.lease_s, now, now)).fetchone()
+        finally:
+            conn.close()
+
+    def release(self, job_id: str) -> None:
+        """Put a claimed job back without counting the attempt (e.g. the pool was full)."""
+        self._update(job_id, "UPDATE jobs SET status='queued', attempts=attempts-1, lease_until=NULL "
+                             "WHERE id=? AND status='running'")
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(job_id, "UPDATE jobs SET status='done', result=?, payload=NULL, finished=? WHERE id=?",
+                     json.dumps(result), time.time())
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._update(job_id, "UPDATE jobs SET status='failed', error=?, payload=NULL, finished=? WHERE id=?",
+                     error, time.time())
+
+    def _update(self, job_id: str, sql: str, *params) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(sql, (*params, job_id))
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT id, status, filename, created, started, finished, result, error "
+                               "FROM jobs WHERE id=?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def pending(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+        finally:
+            conn.close()
+
+    def purge(self, older_than_s: float) -> int:
+        """Delete finished jobs older than `older_than_s`; returns how many went."""
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                                    (*_FINAL, time.time() - older_than_s)).rowcount
+        finally:
+            conn.close()
+
+
+class JobWorkers:
+    """
+    Background threads draining a JobQueue. Each claims a job, hands it to `submit`
+    (which returns a concurrent Future, e.g. the bounded analysis pool) and records the
+    outcome. When `submit` raises `busy` the job goes back to the queue for a while.
+    """
+
+    def __init__(self, queue: JobQueue, submit: Callable, busy: type = Exception,
+                 threads: int = 2, poll_s: float = 1.0, backoff_s: float = 5.0):
+        self.queue = queue
+        self.submit = submit
+        self.busy = busy
+        self.poll_s = poll_s
+        self.backoff_s = backoff_s
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True) for i in range(threads)]
+
+    def start(self) -> None:
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def notify(self) -> None:
+        """New work was queued; skip the rest of the poll interval."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                worked = self._step()
+            except Exception:
+                worked = False  # e.g. the queue file is briefly locked; try again next poll
+            if not worked:
+                self._wake.wait(self.poll_s)
+                self._wake.clear()
+
+    def _step(self) -> bool:
+        """Run one job; False if there was nothing to do."""
+        job = self.queue.claim()
+        if job is None:
+            return False
+        try:
+            fut = self.submit(job["payload"], job["ext"], job["jd"], job["sha"], job["filename"] or "")
+        except self.busy:
+            self.queue.release(job["id"])
+            self._stop.wait(self.backoff_s)
+            return True
+        try:
+            result = fut.result()
+        except Exception as e:
+            if self._stop.is_set():
+                self.queue.release(job["id"])  # cancelled by shutdown; run it after restart
+            else:
+                self.queue.fail(job["id"], f"Analysis failed: {e}")
+            return True
+        result["meta"] = {"filename": job["filename"], "ext": job["ext"], "size_mb": round(job["size_mb"], 3)}
+        self.queue.finish(job["id"], result)
+        return True
+
+
+@process_wide
+def get_job_queue() -> JobQueue:
+    """Process-wide queue at config.JOBS_PATH."""
+    return JobQueue(config.JOBS_PATH, lease_s=config.JOB_LEASE_S)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import sqlite3
+import time
+
+from app import config
+from app.sqlite_store import SQLiteStore, process_wide
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads(
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,   -- insertion order; pages are keyed on it
+    name          TEXT NOT NULL UNIQUE,                -- file name inside UPLOAD_DIR
+    original_name TEXT,
+    size          INTEGER NOT NULL,
+    sha256        TEXT,
+    mtime         REAL NOT NULL,
+    analysis_uid  TEXT,                                -- first user_data.Analysis_UID; all are in upload_analyses
+    source        TEXT                                 -- streamlit | api | scan
+);
+CREATE INDEX IF NOT EXISTS uploads_sha ON uploads(sha256);
+-- content-addressed files are saved once but can be analyzed many times: one row per analysis
+CREATE TABLE IF NOT EXISTS upload_analyses(
+    upload_id     INTEGER NOT NULL REFERENCES uploads(id),
+    analysis_uid  TEXT NOT NULL,
+    original_name TEXT,
+    source        TEXT,
+    created       REAL NOT NULL,
+    PRIMARY KEY (upload_id, analysis_uid)
+);
+INSERT OR IGNORE INTO upload_analyses(upload_id, analysis_uid, original_name, source, created)
+    SELECT id, analysis_uid, original_name, source, mtime FROM uploads WHERE analysis_uid IS NOT NULL;
+"""
+
+
+class UploadManifest(SQLiteStore):
+    """
+    Append-only record of the files saved to UPLOAD_DIR, written as each file is saved,
+    so the Admin Uploads tab pages through an index instead of globbing and stat-ing
+    the directory. `rescan` picks up files that were copied in by hand. Every analysis
+    of a file is linked to it in upload_analyses, not just the one that saved it.
+    """
+
+    schema = _SCHEMA
+    row_factory = sqlite3.Row
+
+    def add(self, name: str, size: int, sha256: Optional[str] = None, mtime: Optional[float] = None,
+            original_name: Optional[str] = None, analysis_uid: Optional[str] = None,
+            source: Optional[str] = None) -> None:
+        mtime = mtime or time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO uploads(name, original_name, size, sha256, mtime, analysis_uid, source) "
+                             "VALUES (?,?,?,?,?,?,?)",
+                             (name, original_name, size, sha256, mtime, analysis_uid, source))
+                if analysis_uid:
+                    conn.execute("INSERT OR IGNORE INTO upload_analyses(upload_id, analysis_uid, original_name, source, created) "
+                                 "SELECT id, ?, ?, ?, ? FROM uploads WHERE name = ?",
+                                 (analysis_uid, original_name, source, mtime, name))
+        finally:
+            conn.close()
+
+    def page(self, before_id: Optional[int] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Newest first; pass the last row's id as `before_id` for the next page. Each row also
+        carries `analyses` (how many analyses are linked) and `last_analysis_uid`.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT u.*, "
+                "(SELECT COUNT(*) FROM upload_analyses a WHERE a.upload_id = u.id) AS analyses, "
+                "(SELECT a.analysis_uid FROM upload_analyses a WHERE a.upload_id = u.id "
+                " ORDER BY a.created DESC LIMIT 1) AS last_analysis_uid "
+                "FROM uploads u WHERE u.id < ? ORDER BY u.id DESC LIMIT ?",
+                (before_id if before_id is not None else 2 ** 63 - 1, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+    def analyses(self, upload_id: int) -> List[Dict[str, Any]]:
+        """Every analysis linked to one upload, newest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT analysis_uid, original_name, source, created FROM upload_analyses "
+                                "WHERE upload_id = ? ORDER BY created DESC", (upload_id,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            files, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM uploads").fetchone()
+        finally:
+            conn.close()
+        return {"files": files, "bytes": size}
+
+    def rescan(self, folder: str | Path) -> int:
+        """
+        Add files in `folder` that the manifest does not know yet (one directory walk); returns
+        how many. Temp files of saves still in progress (*.part, see persist_upload) are skipped.
+        """
+        conn = self._connect()
+        try:
+            known = {r[0] for r in conn.execute("SELECT name FROM uploads")}
+        finally:
+            conn.close()
+        rows = []
+        for p in Path(folder).iterdir():
+            if p.name in known or p.suffix == ".part" or not p.is_file():
+                continue
+            try:
+                st = p.stat()
+                sha = hashlib.sha256(p.read_bytes()).hexdigest()
+            except FileNotFoundError:
+                continue  # removed while we were walking
+            rows.append((p.name, None, st.st_size, sha, st.st_mtime, None, "scan"))
+        rows.sort(key=lambda r: r[4])  # oldest first, so ids follow mtime
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO uploads(name, original_name, size, sha256, mtime, analysis_uid, source) "
+                                 "VALUES (?,?,?,?,?,?,?)", rows)
+        finally:
+            conn.close()
+        return len(rows)
+
+
+@process_wide
+def get_upload_manifest() -> UploadManifest:
+    """Process-wide manifest at config.MANIFEST_PATH; a new one is backfilled from UPLOAD_DIR once."""
+    fresh = not Path(config.MANIFEST_PATH).exists()
+    manifest = UploadManifest(config.MANIFEST_PATH)
+    if fresh:
+        manifest.rescan(config.UPLOAD_DIR)
+    return manifest
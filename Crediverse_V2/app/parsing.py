@@ -1,13 +1,64 @@
 from __future__ import annotations
+from io import BytesIO
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import os
+import re
+import zipfile
 from pypdf import PdfReader
 from docx import Document
 
-def extract_text_from_pdf(path: str) -> str:
-    r = PdfReader(path)
-    return "\n".join([(p.extract_text() or "") for p in r.pages]).strip()
+# bump when extractor output (or what prepare() caches of it) changes; part of the
+# extraction cache key
+PARSER_VERSION = "3"
 
-def extract_text_from_docx(path: str) -> str:
-    doc = Document(path)
+# a saved path, the raw upload bytes, or an open binary file
+Source = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, BinaryIO]
+
+def _open(src: Source):
+    """Hand extractors a path or a stream; in-memory uploads are never written to disk."""
+    if isinstance(src, os.PathLike):
+        return os.fspath(src)
+    if isinstance(src, memoryview) and isinstance(src.obj, bytes) and src.nbytes == len(src.obj):
+        src = src.obj
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return BytesIO(src)  # shares a bytes buffer instead of copying it
+    return src
+
+def _pdf_pages(r: PdfReader, max_pages: Optional[int]) -> Iterator[str]:
+    for i, page in enumerate(r.pages):
+        if max_pages is not None and i >= max_pages:
+            return
+        yield page.extract_text() or ""
+
+def iter_pdf_pages(src: Source, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Page texts, decoded one at a time as the caller asks; stops after max_pages."""
+    return _pdf_pages(PdfReader(_open(src)), max_pages)
+
+def read_pdf(src: Source, max_pages: Optional[int] = None) -> Tuple[List[str], int]:
+    """
+    (page texts, total page count). The count is read from the page tree, so pages past
+    `max_pages` are counted but never decoded.
+    """
+    r = PdfReader(_open(src))
+    return list(_pdf_pages(r, max_pages)), len(r.pages)
+
+def extract_text_from_pdf(src: Source, max_pages: Optional[int] = None) -> str:
+    return "\n".join(iter_pdf_pages(src, max_pages)).strip()
+
+def docx_page_count(src: Source) -> Optional[int]:
+    """Page count Word saved in docProps/app.xml; None if the file does not carry one."""
+    try:
+        f = _open(src)
+        if hasattr(f, "seek"):
+            f.seek(0)
+        with zipfile.ZipFile(f) as z:
+            m = re.search(rb"<(?:\w+:)?Pages>\s*(\d+)\s*<", z.read("docProps/app.xml"))
+        return int(m.group(1)) if m and int(m.group(1)) > 0 else None
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return None
+
+def extract_text_from_docx(src: Source) -> str:
+    doc = Document(_open(src))
     lines = [p.text for p in doc.paragraphs if p.text]
     for t in doc.tables:
         for row in t.rows:
@@ -0,0 +1,199 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import hashlib
+import os
+import time
+import uuid
+
+from app import config
+from app.parsing import Source, read_pdf, extract_text_from_docx, docx_page_count
+from app.ai.preprocess import Sections
+from app.ai.document import ResumeDocument
+from app.ai.scoring import score_resume
+from app.ai.skills import extract_skills, infer_track, current_skills, top_tracks
+from app.ai.ats import coverage
+from app.ai.suggestions import suggestions
+from app.cache import get_extraction_cache
+from app.executor import BoundedExecutor
+from app.manifest import get_upload_manifest
+from app.search import get_resume_index
+
+
+def extract_document(src: Source, ext: str) -> Dict[str, Any]:
+    """
+    Pick the extractor for an upload (path, bytes or file object) by its extension.
+    Returns {text, pages, page_count}: PDFs are parsed page by page up to
+    config.MAX_PDF_PAGES, while page_count is always the document's real length (for
+    DOCX, the count Word stored in the file, else 1; `pages` is empty).
+    """
+    if ext == ".pdf":
+        pages, count = read_pdf(src, config.MAX_PDF_PAGES or None)
+        return {"text": "\n".join(pages).strip(), "pages": pages, "page_count": count}
+    return {"text": extract_text_from_docx(src), "pages": [], "page_count": docx_page_count(src) or 1}
+
+
+def extract_text(src: Source, ext: str) -> str:
+    return extract_document(src, ext)["text"]
+
+
+def page_count(sections) -> int:
+    return sections.get("__page_count__") or 1
+
+
+def upload_name(ext: str, sha: Optional[str] = None) -> str:
+    """File name in UPLOAD_DIR: content-addressed when the sha256 is given, else random."""
+    return f"{sha or uuid.uuid4().hex}{ext}"
+
+
+def persist_upload(data: bytes, ext: str, sha: Optional[str] = None, filename: Optional[str] = None,
+                   analysis_uid: Optional[str] = None, source: Optional[str] = None,
+                   name: Optional[str] = None) -> Path:
+    """
+    Keep a copy of an upload in UPLOAD_DIR and record it in the upload manifest.
+    Not needed for analysis; run it in the background. Pass `name` (see upload_name)
+    to know the file name up front, e.g. for a preview URL; a content-addressed name
+    that already exists is not written again.
+    """
+    out = config.UPLOAD_DIR / (name or upload_name(ext))
+    if not out.exists():
+        tmp = out.with_name(f"{out.name}.{uuid.uuid4().hex[:8]}.part")
+        tmp.write_bytes(data)
+        os.replace(tmp, out)  # never serve a half-written file
+    get_upload_manifest().add(out.name, len(data), sha or hashlib.sha256(data).hexdigest(), time.time(),
+                              filename, analysis_uid, source)
+    return out
+
+
+def prepare_text(resume_text: str, pages: Optional[List[str]] = None,
+                 page_count: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The JD-independent part of the pipeline: {text, sections, tokens} (text is normalized).
+    Only the page count is kept; the page texts are already joined into the text.
+    """
+    doc = ResumeDocument(resume_text, page_count or (len(pages) if pages else None))
+    return {"text": doc.text, "sections": doc.sections, "tokens": doc.tokens}
+
+
+def _pack(prep: Dict[str, Any]) -> Dict[str, Any]:
+    # cache form: section offsets, not section copies; the text is stored once
+    return {"sections": prep["sections"].to_json(), "tokens": prep["tokens"]}
+
+
+def _unpack(cached: Dict[str, Any]) -> Dict[str, Any]:
+    sections = Sections.from_json(cached["sections"])
+    return {"text": sections["__full__"], "sections": sections, "tokens": cached["tokens"]}
+
+
+def prepare(src: Source, ext: str, sha: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract → sectionize → tokenize one upload. With `sha` (sha256 of the uploaded
+    bytes) the result is served from / stored in the extraction cache.
+    """
+    cache = get_extraction_cache() if sha else None
+    if cache is not None:
+        try:
+            hit = cache.get(sha)
+            if hit is not None:
+                return _unpack(hit)
+        except Exception:
+            pass  # a broken cache must never break analysis
+    doc = extract_document(src, ext)
+    prep = prepare_text(doc["text"], doc["pages"], doc["page_count"])
+    if cache is not None:
+        try:
+            cache.put(sha, _pack(prep))
+        except Exception:
+            pass
+    return prep
+
+
+def analyze_prepared(prep: Dict[str, Any], job_description: Optional[str] = None,
+                     sha: Optional[str] = None, name: str = "") -> Dict[str, Any]:
+    """
+    Run score → skills → tracks → ATS → suggestions on a prepare() result.
+    Returns the AnalyzeResponse body without `meta`. With `sha` the tokens are also
+    added to the candidate search index.
+    """
+    doc = ResumeDocument.from_prepared(prep)
+    sections = doc.sections
+    score, score_details_raw = score_resume(doc)
+    if sha:
+        index_resume(sha, doc.tokens, name)
+    auto_skills = extract_skills(doc)
+
+    # tracks
+    track_list = top_tracks(auto_skills, current_skills(), k=3)  # [(track, score, matched)]
+    fallback = infer_track(auto_skills)
+    best_track = track_list[0][0] if (track_list and track_list[0][1] > 0) else (fallback or "General Software")
+
+    # ats coverage (optional)
+    ats_block = None
+    if job_description and job_description.strip():
+        pct, present, missing = coverage(doc, job_description)
+        ats_block = {
+            "percent": pct,
+            "present": present[:100],
+            "missing": missing[:100],
+        }
+
+    pages = page_count(sections)
+    user_level = "Fresher" if pages == 1 else ("Intermediate" if pages == 2 else "Experienced")
+
+    # normalize structures for response_model
+    score_details = [
+        {"key": k, "present": bool(present), "weight": float(w)}
+        for (k, present, w) in score_details_raw
+    ]
+    tracks = [
+        {"name": t, "score": float(sc), "matched": matched or []}
+        for (t, sc, matched) in (track_list or [])
+    ]
+
+    return {
+        "score": int(score),
+        "score_details": score_details,
+        "detected_skills": auto_skills,
+        "suggested_track": best_track,
+        "tracks": tracks,
+        "pages": int(pages),
+        "user_level": user_level,
+        "ats": ats_block,
+        "suggestions": list(suggestions(doc, auto_skills, ats_block["missing"] if ats_block else [])),
+    }
+
+
+def analyze_text(resume_text: str, job_description: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze already-extracted text (no cache, no indexing)."""
+    return analyze_prepared(prepare_text(resume_text), job_description)
+
+
+def analyze_file(src: Source, ext: str, job_description: Optional[str] = None,
+                 sha: Optional[str] = None, name: str = "") -> Dict[str, Any]:
+    """Extract + analyze one upload. Top-level so it can run in a worker process."""
+    return analyze_prepared(prepare(src, ext, sha), job_description, sha, name)
+
+
+def index_resume(key: str, resume_tokens: List[str], name: str = "") -> None:
+    """Best-effort add to the BM25 candidate index; analysis never fails because of it."""
+    try:
+        get_resume_index().add(key, resume_tokens, name)
+    except Exception:
+        pass
+
+
+# ---------- analysis worker pool ----------
+_pool: Optional[BoundedExecutor] = None
+
+def get_analysis_pool() -> BoundedExecutor:
+    """Bounded pool shared by /analyze and /analyze/batch (see config.ANALYZE_*)."""
+    global _pool
+    if _pool is None:
+        _pool = BoundedExecutor(config.ANALYZE_EXECUTOR, config.ANALYZE_WORKERS, config.ANALYZE_QUEUE)
+    return _pool
+
+def shutdown_analysis_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from urllib.parse import quote, urlencode
+from urllib.request import urlopen
+
+from app import config
+
+_key: Optional[bytes] = None
+_reachable: Tuple[float, bool] = (0.0, False)  # (checked at, answer)
+
+
+def _signing_key() -> bytes:
+    """PREVIEW_SECRET, else a random key kept in DATA_DIR so the app and the API share it."""
+    global _key
+    if _key is None:
+        if config.PREVIEW_SECRET:
+            _key = config.PREVIEW_SECRET.encode()
+        else:
+            path = config.DATA_DIR / "preview.key"
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(secrets.token_bytes(32))
+            except FileExistsError:
+                pass
+            _key = path.read_bytes()
+    return _key
+
+
+def _sign(name: str, exp: int) -> str:
+    return hmac.new(_signing_key(), f"{name}:{exp}".encode(), hashlib.sha256).hexdigest()
+
+
+def preview_url(name: str, ttl_s: Optional[int] = None) -> str:
+    """
+    Signed API URL for a file in UPLOAD_DIR, valid for ttl_s to 2 * ttl_s. The expiry is
+    rounded to the TTL, so reruns produce the same URL and the browser's cached copy is reused.
+    """
+    ttl_s = ttl_s or config.PREVIEW_TTL_S
+    exp = (int(time.time()) // ttl_s + 2) * ttl_s
+    query = urlencode({"exp": exp, "sig": _sign(name, exp)})
+    return f"{config.API_BASE_URL}/uploads/{quote(name)}?{query}"
+
+
+def check_signature(name: str, exp: int, sig: str) -> bool:
+    return exp >= time.time() and hmac.compare_digest(_sign(name, exp), sig)
+
+
+def api_reachable(ttl_s: float = 60) -> bool:
+    """Whether the API answers at API_BASE_URL (checked at most once per ttl_s)."""
+    global _reachable
+    checked, ok = _reachable
+    if checked and time.monotonic() - checked < ttl_s:
+        return ok
+    try:
+        with urlopen(f"{config.API_BASE_URL}/queue", timeout=1) as r:
+            ok = r.status == 200
+    except Exception:
+        ok = False
+    _reachable = (time.monotonic(), ok)
+    return ok
+
+
+def preview_src(name: str, data: bytes) -> str:
+    """
+    iframe src for a saved PDF: the signed API URL (cached by the browser, fetched by
+    range), or a base64 data URI when PDF_PREVIEW=inline or the API does not answer.
+    """
+    if config.PDF_PREVIEW == "inline" or not api_reachable():
+        return "data:application/pdf;base64," + base64.b64encode(data).decode()
+    return preview_url(name)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import math
+import sqlite3
+import time
+
+from app import config
+from app.sqlite_store import SQLiteStore, process_wide
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs(
+    id      INTEGER PRIMARY KEY,
+    key     TEXT UNIQUE NOT NULL,      -- sha256 of the uploaded bytes
+    name    TEXT,
+    length  INTEGER NOT NULL,
+    added   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings(  -- clustered by (term, tf): a term's strongest postings read first
+    term    TEXT NOT NULL,
+    tf      INTEGER NOT NULL,
+    doc     INTEGER NOT NULL,
+    dl      INTEGER NOT NULL,          -- doc length, copied so scoring never joins docs
+    PRIMARY KEY (term, tf, doc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms(
+    term    TEXT PRIMARY KEY,
+    df      INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats(
+    k       TEXT PRIMARY KEY,
+    v       REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class ResumeIndex(SQLiteStore):
+    """
+    On-disk BM25 inverted index over `preprocess.tokens` output, one row per unique
+    upload. Documents are added as they are analyzed. A query reads at most
+    `max_query_terms` terms (rarest first) and, per term, its `max_postings` highest-tf
+    postings, so latency is bounded no matter how large the corpus grows. Terms in
+    fewer than `max_postings` resumes are scored exactly; only very common terms are
+    truncated, and those carry little BM25 weight anyway. Scores are summed and
+    ranked inside SQLite (one GROUP BY), not row by row in Python; see
+    benchmarks/bench_search.py.
+    """
+
+    schema = _SCHEMA
+
+    def __init__(self, path: str | Path, k1: float = 1.2, b: float = 0.75,
+                 max_query_terms: int = 64, max_postings: int = 50000):
+        self.k1, self.b = k1, b
+        self.max_query_terms = max_query_terms
+        self.max_postings = max_postings
+        super().__init__(path)
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return int(self._stat(conn, "n"))
+
+    @staticmethod
+    def _stat(conn: sqlite3.Connection, k: str) -> float:
+        row = conn.execute("SELECT v FROM stats WHERE k=?", (k,)).fetchone()
+        return row[0] if row else 0.0
+
+    def add(self, key: str, toks: Iterable[str], name: str = "") -> bool:
+        """Index one document; returns False if `key` is already indexed."""
+        tf = Counter(toks)
+        length = sum(tf.values())
+        conn = self._connect()
+        try:
+            with conn:
+                cur = conn.execute("INSERT OR IGNORE INTO docs(key, name, length, added) VALUES (?,?,?,?)",
+                                   (key, name, length, time.time()))
+                if cur.rowcount == 0:
+                    return False
+                doc = cur.lastrowid
+                conn.executemany("INSERT INTO postings(term, tf, doc, dl) VALUES (?,?,?,?)",
+                                 [(t, c, doc, length) for t, c in tf.items()])
+                conn.executemany("INSERT INTO terms(term, df) VALUES (?,1) "
+                                 "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                                 [(t,) for t in tf])
+                conn.executemany("INSERT INTO stats(k, v) VALUES (?,?) "
+                                 "ON CONFLICT(k) DO UPDATE SET v = v + excluded.v",
+                                 [("n", 1), ("total_len", length)])
+            return True
+        finally:
+            conn.close()
+
+    def search(self, query_tokens: Iterable[str], k: int = 10) -> List[Dict]:
+        """Top-k documents by BM25 against the query's unique terms."""
+        q = set(query_tokens)
+        if not q or k <= 0:
+            return []
+        conn = self._connect()
+        try:
+            n = self._stat(conn, "n")
+            if not n:
+                return []
+            avgdl = self._stat(conn, "total_len") / n
+            marks = ",".join("?" * len(q))
+            df = dict(conn.execute(f"SELECT term, df FROM terms WHERE term IN ({marks})", list(q)))
+            idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+            # rarest terms carry the ranking; common ones cost the most postings to scan, and
+            # a term in ~every resume (idf ~ 0) cannot change the order at all
+            weights = sorted(((t, w) for t, w in idf.items() if w >= 0.05),
+                             key=lambda x: x[1], reverse=True)[: self.max_query_terms]
+            if not weights:
+                return []
+
+            # BM25 term score with the per-query constants folded in:
+            #   w * (k1 + 1) * tf / (tf + k1 * (1 - b) + k1 * b / avgdl * dl)
+            k1, b = self.k1, self.b
+            parts, params = [], []
+            for term, w in weights:
+                part = "SELECT doc, ? * tf / (tf + ? + ? * dl) AS s FROM postings WHERE term = ?"
+                if df[term] > self.max_postings:
+                    part = f"SELECT * FROM ({part} ORDER BY tf DESC LIMIT {int(self.max_postings)})"
+                parts.append(part)
+                params += [w * (k1 + 1), k1 * (1 - b), k1 * b / avgdl, term]
+            top = conn.execute(f"SELECT doc, SUM(s) AS score FROM ({' UNION ALL '.join(parts)}) "
+                               "GROUP BY doc ORDER BY score DESC LIMIT ?", (*params, int(k))).fetchall()
+            if not top:
+                return []
+            names = {doc: (key, name) for doc, key, name in conn.execute(
+                f"SELECT id, key, name FROM docs WHERE id IN ({','.join('?' * len(top))})", [d for d, _ in top])}
+            return [{"key": names[d][0], "name": names[d][1], "score": round(sc, 4)} for d, sc in top]
+        finally:
+            conn.close()
+
+
+@process_wide
+def get_resume_index() -> ResumeIndex:
+    """Process-wide index at config.INDEX_PATH."""
+    return ResumeIndex(config.INDEX_PATH)
+
+
+if __name__ == "__main__":
+    # backfill: python -m app.search  (indexes everything already in UPLOAD_DIR)
+    import hashlib
+    from app.pipeline import extract_text
+    from app.ai.preprocess import sectionize, tokens
+
+    idx = get_resume_index()
+    added = 0
+    for p in sorted(config.UPLOAD_DIR.glob("*")):
+        if p.suffix.lower() not in config.ALLOWED_EXT:
+            continue
+        key = hashlib.sha256(p.read_bytes()).hexdigest()
+        added += idx.add(key, tokens(sectionize(extract_text(p, p.suffix.lower()))["__full__"]), p.name)
+    print(f"indexed {added} new file(s); {len(idx)} total")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+from functools import wraps
+from pathlib import Path
+from typing import Callable, List, Optional, TypeVar
+import sqlite3
+import threading
+
+T = TypeVar("T")
+
+
+class SQLiteStore:
+    """
+    Base for the app's SQLite files (extraction cache, BM25 index, job queue, upload
+    manifest). Subclasses set `schema`, which runs on every open and so must be
+    idempotent, and `row_factory` if they want sqlite3.Row rows. Each call opens its
+    own connection, which keeps a store usable from threads and worker processes;
+    WAL lets readers run while one process writes.
+    """
+
+    schema = ""
+    row_factory: Optional[Callable] = None
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(self.schema)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+
+def process_wide(factory: Callable[[], T]) -> Callable[[], T]:
+    """Turn a zero-argument factory into an accessor that builds its object once per process."""
+    lock = threading.Lock()
+    made: List[T] = []
+
+    @wraps(factory)
+    def get() -> T:
+        if not made:
+            with lock:
+                if not made:
+                    made.append(factory())
+        return made[0]
+
+    return get
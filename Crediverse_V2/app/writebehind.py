@@ -0,0 +1,198 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import queue
+import threading
+import time
+
+
+class WriteBehind:
+    """
+    Buffers rows in memory and writes them from a background thread, so callers never
+    wait on the database. A batch goes out when `batch_size` rows are waiting or
+    `flush_s` after its first row, through `flush(rows)` (one executemany). A failed
+    batch is retried `retries` times with backoff, then appended to `spill_path`
+    (JSON lines); spilled rows are replayed once writes succeed again. When the
+    in-memory queue is full, rows are spilled straight away instead of blocking.
+
+    What happens to a failed batch depends on the error. Exceptions listed in
+    `row_errors` blame the data (for MySQL: IntegrityError, DataError): they are not
+    retried, and the batch is split in halves until the rows that fail on their own
+    are found. Those go to `dead_path` (JSON lines, next to the spill file) so a bad
+    row cannot hold back the rest. Any other error means the database is unavailable,
+    and whatever is still unwritten is spilled. Spill lines that do not decode are
+    moved to `dead_path` as they are.
+    """
+
+    def __init__(self, flush: Callable[[List[Sequence[Any]]], None], spill_path: str | Path,
+                 batch_size: int = 200, flush_s: float = 2.0, max_queue: int = 10000,
+                 retries: int = 3, backoff_s: float = 0.5, replay_s: float = 30.0,
+                 dead_path: Optional[str | Path] = None,
+                 row_errors: Tuple[type, ...] = (ValueError, TypeError)):
+        self.flush = flush
+        self.row_errors = row_errors
+        self.spill_path = Path(spill_path)
+        self.dead_path = Path(dead_path) if dead_path else self.spill_path.with_suffix(".dead.jsonl")
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.replay_s = replay_s
+        self._q: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._next_replay = 0.0
+        self._counts = {"written": 0, "spilled": 0, "replayed": 0, "failed_batches": 0, "dead_lettered": 0}
+        self._last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def start(self) -> "WriteBehind":
+        self._thread.start()
+        return self
+
+    def put(self, row: Sequence[Any]) -> None:
+        """Queue one row; never blocks."""
+        try:
+            self._q.put_nowait(tuple(row))
+        except queue.Full:
+            self._spill([tuple(row)])
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued (spilling whatever cannot be written) and stop the thread."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self._q.qsize(), **self._counts,
+                "spill_file_rows": self._spill_rows(), "last_error": self._last_error}
+
+    # ---- writer thread ----
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._q.empty()):
+            try:
+                batch = self._take()
+                if batch:
+                    self._write(batch)
+                if time.monotonic() >= self._next_replay and not self._stop.is_set():
+                    self._replay()
+            except Exception as e:  # e.g. the spill file is not writable; keep the thread alive
+                self._last_error = f"{type(e).__name__}: {e}"
+                time.sleep(self.backoff_s)
+
+    def _take(self) -> List[tuple]:
+        """Up to batch_size rows: waits for the first, then at most flush_s for the rest."""
+        try:
+            batch = [self._q.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                remaining = 0
+            try:
+                batch.append(self._q.get(timeout=remaining) if remaining else self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _try_flush(self, rows: List[tuple]) -> Optional[Exception]:
+        """None once `rows` are written, else the last error; errors in row_errors are not retried."""
+        err = None
+        for attempt in range(self.retries + 1):
+            try:
+                self.flush(rows)
+                return None
+            except Exception as e:
+                err = e
+                self._last_error = f"{type(e).__name__}: {e}"
+                if isinstance(e, self.row_errors):
+                    break  # the same rows fail the same way every time
+                if attempt < self.retries and not self._stop.is_set():
+                    time.sleep(self.backoff_s * 2 ** attempt)
+        self._counts["failed_batches"] += 1
+        return err
+
+    def _deliver(self, rows: List[tuple]) -> Tuple[int, List[tuple]]:
+        """
+        Write `rows`, halving any part that fails with a row error until the bad rows are
+        isolated and dead-lettered. Returns (rows written, rows left unwritten because the
+        database became unavailable); the caller spills the latter.
+        """
+        written, bad, parts = 0, [], [rows]
+        while parts:
+            part = parts.pop()
+            err = self._try_flush(part)
+            if err is None:
+                written += len(part)
+            elif not isinstance(err, self.row_errors):
+                self._dead_letter([json.dumps(r, default=str) for r in bad])
+                return written, part + [r for p in reversed(parts) for r in p]
+            elif len(part) > 1:
+                mid = len(part) // 2
+                parts += [part[mid:], part[:mid]]  # left half first
+            else:
+                bad.append(part[0])
+        self._dead_letter([json.dumps(r, default=str) for r in bad])
+        return written, []
+
+    def _write(self, rows: List[tuple]) -> None:
+        written, unsent = self._deliver(rows)
+        self._counts["written"] += written
+        if unsent:
+            self._spill(unsent)
+            self._next_replay = time.monotonic() + self.replay_s  # the DB is down; don't hammer it
+
+    # ---- spill file ----
+    def _spill(self, rows: List[tuple], count: bool = True) -> None:
+        with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, default=str) + "\n")
+        if count:
+            self._counts["spilled"] += len(rows)
+
+    def _dead_letter(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        with self._spill_lock, open(self.dead_path, "a", encoding="utf-8") as f:
+            for ln in lines:
+                f.write(ln + "\n")
+        self._counts["dead_lettered"] += len(lines)
+
+    def _spill_rows(self) -> int:
+        try:
+            with open(self.spill_path, "rb") as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def _replay(self) -> None:
+        """Write spilled rows back in batches; whatever still fails is spilled again."""
+        self._next_replay = time.monotonic() + self.replay_s
+        work = self.spill_path.with_name(self.spill_path.name + ".replay")
+        with self._spill_lock:
+            if not work.exists():
+                if not self.spill_path.exists():
+                    return
+                os.replace(self.spill_path, work)
+        rows, torn = [], []
+        with open(work, encoding="utf-8", errors="replace") as f:
+            for ln in f:
+                if not ln.strip():
+                    continue
+                try:
+                    rows.append(tuple(json.loads(ln)))
+                except ValueError:  # a line cut short by a crash mid-write
+                    torn.append(ln.rstrip("\n"))
+        self._dead_letter(torn)
+        for i in range(0, len(rows), self.batch_size):
+            written, unsent = self._deliver(rows[i:i + self.batch_size])
+            self._counts["replayed"] += written
+            if unsent:
+                # already counted when first spilled
+                self._spill(unsent + rows[i + self.batch_size:], count=False)
+                break
+        work.unlink()
@@ -0,0 +1,92 @@
+"""
+Benchmark: ats.coverage's single cdist call and FuzzyIndex lookups vs brute-force
+per-term extractOne scans, with output checked.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_fuzzy [--pairs 400]
+
+Corpus = every PDF/DOCX in Uploaded_Resumes. For ats.coverage each resume is compared
+against the text of other resumes used as long "JDs" (and again with 8 resumes
+glued together per side, to show how each approach scales); for extract_skills the typo
+pass is compared skill-by-skill against the old per-skill extractOne loop.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import time
+
+from rapidfuzz import process, fuzz
+
+from app.ai.ats import coverage
+from app.ai.fuzzy import FuzzyIndex
+from app.ai.preprocess import tokens
+from app.ai.skills import current_skills
+from benchmarks.bench_skills import load_corpus
+
+CANON = current_skills().canon
+
+
+def legacy_coverage(resume_text, jd_text, min_score=90):
+    r = set(tokens(resume_text))
+    j = set(tokens(jd_text))
+    present, missing = [], []
+    for term in j:
+        if term in r:
+            present.append(term); continue
+        match = process.extractOne(term, r, scorer=fuzz.ratio)
+        if match and match[1] >= min_score:
+            present.append(term)
+        else:
+            missing.append(term)
+    pct = 0 if not j else round(100 * len(present) / len(j))
+    return pct, sorted(present), sorted(missing)
+
+
+def legacy_fuzzy_skills(toks, min_score=90):
+    low = set(toks)
+    return {s for s in CANON if (m := process.extractOne(s, low, scorer=fuzz.ratio)) and m[1] >= min_score}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=400)
+    args = ap.parse_args()
+
+    docs = load_corpus()
+    pairs = list(itertools.islice(((a[0], b[0]) for a, b in itertools.permutations(docs, 2)), args.pairs))
+    print(f"{len(docs)} resumes, {len(pairs)} resume/JD pairs")
+
+    # ---- ats.coverage: fixture-sized docs, then 8 fixtures glued together per side ----
+    texts = [d[0] for d in docs]
+    big = ["\n".join(texts[i:i + 8]) for i in range(0, len(texts) - 7, 4)]
+    big_pairs = list(itertools.permutations(big, 2))
+    for label, ps in (("coverage", pairs), ("coverage x8", big_pairs)):
+        t0 = time.perf_counter()
+        old = [legacy_coverage(r, j) for r, j in ps]
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = [coverage(r, j) for r, j in ps]
+        t_new = time.perf_counter() - t0
+        print(f"{label:<11} legacy {t_old / len(ps) * 1e3:7.2f} ms  cdist {t_new / len(ps) * 1e3:7.2f} ms"
+              f"  ({t_old / t_new:.1f}x)  identical={old == new}")
+
+    # ---- skill typo pass: warm index (process-wide in extract_skills) ----
+    toks = [t for _, t in docs]
+    t0 = time.perf_counter()
+    old = [legacy_fuzzy_skills(t) for t in toks]
+    t_old = time.perf_counter() - t0
+    for memo in (0, 100_000):
+        index = FuzzyIndex(CANON, memo_size=memo)
+        for t in toks[:5]:  # spend the lazy-build budget outside the timing
+            for tok in set(t):
+                index.matches(tok)
+        index._memo.clear()
+        t0 = time.perf_counter()
+        new = [{w for tok in set(t) for w in index.matches(tok)} for t in toks]
+        t_new = time.perf_counter() - t0
+        label = "skills" if not memo else "skills memo"
+        print(f"{label:<11} legacy {t_old / len(toks) * 1e3:7.2f} ms  index {t_new / len(toks) * 1e3:7.2f} ms"
+              f"  ({t_old / t_new:.1f}x)  identical={old == new}")
+
+if __name__ == "__main__":
+    main()
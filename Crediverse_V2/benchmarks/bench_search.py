@@ -0,0 +1,126 @@
+"""
+Benchmark: ResumeIndex.search latency at six-figure corpus sizes.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_search [--docs 100000] [--queries 5] [--index /tmp/bench_index.sqlite]
+
+Builds a synthetic index (each document has --doc-terms unique terms drawn Zipf-style from
+a --vocab vocabulary, tf geometric) straight into the ResumeIndex tables, then runs JDs of
+--jd-terms terms found in 3-85% of the documents. Compares the old per-posting Python loop,
+the current SQL aggregation, and an uncapped exact ranking (top-k overlap). Pass --index
+to keep the built index and reuse it on the next run; building 100k documents takes ~1.5 min.
+"""
+from __future__ import annotations
+import argparse
+import math
+import random
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.search import ResumeIndex
+
+
+def build(idx: ResumeIndex, docs: int, vocab: int, doc_terms: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    p = 1 / np.arange(1, vocab + 1)
+    p /= p.sum()
+    postings, rows, df, total = [], [], np.zeros(vocab, dtype=np.int64), 0
+    for start in range(0, docs, 10000):
+        n = min(10000, docs - start)
+        draws = np.sort(rng.choice(vocab, size=(n, doc_terms * 4), p=p), axis=1)
+        dup = np.zeros_like(draws, dtype=bool)
+        dup[:, 1:] = draws[:, 1:] == draws[:, :-1]
+        prio = np.where(dup, np.inf, rng.random(draws.shape))  # random subset of the unique terms
+        pick = np.take_along_axis(draws, np.argsort(prio, axis=1)[:, :doc_terms], axis=1)
+        tfs = rng.geometric(0.5, size=pick.shape)
+        for i in range(n):
+            doc = start + i + 1
+            terms, tf = pick[i], tfs[i]
+            length = int(tf.sum())
+            total += length
+            rows.append((doc, f"synthetic-{doc}", f"doc{doc}", length, 0.0))
+            postings.extend(zip((f"t{t}" for t in terms.tolist()), tf.tolist(), [doc] * doc_terms, [length] * doc_terms))
+            df[terms] += 1
+    postings.sort()
+    conn = idx._connect()
+    try:
+        with conn:
+            conn.executemany("INSERT INTO docs(id, key, name, length, added) VALUES (?,?,?,?,?)", rows)
+            conn.executemany("INSERT INTO postings(term, tf, doc, dl) VALUES (?,?,?,?)", postings)
+            conn.executemany("INSERT INTO terms(term, df) VALUES (?,?)",
+                             [(f"t{t}", int(c)) for t, c in enumerate(df.tolist()) if c])
+            conn.executemany("INSERT INTO stats(k, v) VALUES (?,?)", [("n", docs), ("total_len", total)])
+    finally:
+        conn.close()
+
+
+def legacy_search(idx: ResumeIndex, q, k=10, max_query_terms=64, max_postings=20000):
+    """The previous implementation: BM25 summed posting by posting in Python."""
+    conn = idx._connect()
+    try:
+        n = idx._stat(conn, "n")
+        avgdl = idx._stat(conn, "total_len") / n
+        df = dict(conn.execute(f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(q))})", list(q)))
+        idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+        weights = sorted(((t, w) for t, w in idf.items() if w >= 0.05), key=lambda x: x[1], reverse=True)
+        scores = {}
+        for term, w in weights[:max_query_terms]:
+            for doc, tf, dl in conn.execute("SELECT doc, tf, dl FROM postings WHERE term=? ORDER BY tf DESC LIMIT ?",
+                                            (term, max_postings)):
+                scores[doc] = scores.get(doc, 0.0) + w * tf * (idx.k1 + 1) / (
+                    tf + idx.k1 * (1 - idx.b + idx.b * dl / avgdl))
+        top = sorted(scores, key=scores.get, reverse=True)[:k]
+        keys = dict(conn.execute(f"SELECT id, key FROM docs WHERE id IN ({','.join('?' * len(top))})", top))
+        return [keys[d] for d in top]
+    finally:
+        conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=100_000)
+    ap.add_argument("--vocab", type=int, default=20_000)
+    ap.add_argument("--doc-terms", type=int, default=120)
+    ap.add_argument("--jd-terms", type=int, default=49)
+    ap.add_argument("--queries", type=int, default=5)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--index", type=Path, default=None, help="index file to build once and reuse")
+    args = ap.parse_args()
+
+    path = args.index or Path(f"/tmp/bench_search_{args.docs}.sqlite")
+    fresh = not path.exists()
+    idx = ResumeIndex(path)
+    if fresh:
+        t0 = time.perf_counter()
+        build(idx, args.docs, args.vocab, args.doc_terms)
+        print(f"built {args.docs} docs in {time.perf_counter() - t0:.0f} s -> {path}")
+    exact = ResumeIndex(path, max_postings=10 ** 9)
+    n = len(idx)
+    conn = idx._connect()
+    try:
+        pool = [t for t, d in conn.execute("SELECT term, df FROM terms") if 0.03 * n <= d <= 0.85 * n]
+    finally:
+        conn.close()
+    rng = random.Random(1)
+    queries = [rng.sample(pool, min(args.jd_terms, len(pool))) for _ in range(args.queries)]
+    print(f"{n} docs, {len(queries)} JDs of {len(queries[0])} terms (in 3-85% of docs), top {args.k}")
+
+    truth = [[r["key"] for r in exact.search(q, args.k)] for q in queries]
+    for label, run in (("legacy loop", lambda q: legacy_search(idx, q, args.k)),
+                       ("sql", lambda q: [r["key"] for r in idx.search(q, args.k)]),
+                       ("sql exact", lambda q: [r["key"] for r in exact.search(q, args.k)])):
+        times, overlap = [], []
+        for q, best in zip(queries, truth):
+            t0 = time.perf_counter()
+            got = run(q)
+            times.append(time.perf_counter() - t0)
+            overlap.append(len(set(got) & set(best)))
+        print(f"{label:<12} p50 {statistics.median(times) * 1e3:7.0f} ms  max {max(times) * 1e3:7.0f} ms  "
+              f"top-{args.k} overlap with exact {overlap}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: single-pass compiled sectionize vs the old per-line pattern loop.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_sectionize [--repeat 20]
+
+Long CVs are built by concatenating the resumes in Uploaded_Resumes (1, 5 and 20 of
+them per document). "sectionize" is the split alone; "+ read all" also slices out
+every section, which the offset-based result only does on access.
+"""
+from __future__ import annotations
+import argparse
+import re
+import time
+import unicodedata
+
+from app import config
+from app.pipeline import extract_text
+from app.ai.preprocess import SECTION_PATTERNS, sectionize
+
+
+def legacy_sectionize(text: str):
+    """The pre-compiled implementation: every pattern re.search'ed on every line."""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = re.sub(r"[ \t]+", " ", text).strip()
+    lines = text.splitlines()
+    out = {"__full__": text}
+    current = "other"; buf = []
+    def flush():
+        if buf:
+            out[current] = (out.get(current, "") + "\n" + "\n".join(buf)).strip()
+    for ln in lines:
+        low = ln.lower().strip()
+        header = next((k for k, pat in SECTION_PATTERNS.items() if re.search(pat, low)), None)
+        if header:
+            flush(); current = header; buf = [ln]
+        else:
+            buf.append(ln)
+    flush()
+    return out
+
+
+def timeit(fn, docs, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for d in docs:
+            fn(d)
+    return (time.perf_counter() - t0) / (repeat * len(docs))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    texts = [extract_text(p, p.suffix.lower())
+             for p in sorted(config.UPLOAD_DIR.glob("*")) if p.suffix.lower() in config.ALLOWED_EXT]
+    for per_doc in (1, 5, 20):
+        docs = ["\n".join(texts[i:i + per_doc]) for i in range(0, len(texts), per_doc)]
+        lines = sum(d.count("\n") + 1 for d in docs) // len(docs)
+        assert all(legacy_sectionize(d) == dict(sectionize(d)) for d in docs)
+
+        old = timeit(legacy_sectionize, docs, args.repeat)
+        new = timeit(sectionize, docs, args.repeat)
+        new_all = timeit(lambda d: [v for v in sectionize(d).values()], docs, args.repeat)
+        print(f"{per_doc:2d} resume(s)/doc, ~{lines} lines: legacy {old * 1e3:7.3f} ms | "
+              f"sectionize {new * 1e3:7.3f} ms ({old / new:.1f}x) | "
+              f"+ read all {new_all * 1e3:7.3f} ms ({old / new_all:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
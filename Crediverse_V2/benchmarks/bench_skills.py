@@ -0,0 +1,82 @@
+"""
+Benchmark: extract_skills (compiled phrase matcher) vs the old per-skill fuzzy loop.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_skills [--repeat 20]
+
+Corpus = every PDF/DOCX in Uploaded_Resumes. The old loop is timed on the same,
+expanded vocabulary (SKILL_BANK + skills_map.json) so the comparison is like-for-like.
+"""
+from __future__ import annotations
+import argparse
+import time
+
+from rapidfuzz import process, fuzz
+
+from app import config
+from app.parsing import extract_text_from_pdf, extract_text_from_docx
+from app.ai.preprocess import sectionize, tokens
+from app.ai.skills import current_skills, extract_skills
+
+CANON = current_skills().canon
+
+
+def legacy_extract_skills(toks, min_score=90):
+    """The pre-matcher implementation: one extractOne per canonical skill."""
+    found = set()
+    low = set(toks)
+    for s in CANON:
+        if s in low:
+            found.add(s)
+        else:
+            match = process.extractOne(s, low, scorer=fuzz.ratio)
+            if match and match[1] >= min_score:
+                found.add(s)
+    return sorted(found)
+
+
+def load_corpus():
+    docs = []
+    for p in sorted(config.UPLOAD_DIR.glob("*")):
+        if p.suffix.lower() == ".pdf":
+            text = extract_text_from_pdf(str(p))
+        elif p.suffix.lower() == ".docx":
+            text = extract_text_from_docx(str(p))
+        else:
+            continue
+        full = sectionize(text)["__full__"]
+        docs.append((full, tokens(full)))
+    return docs
+
+
+def timeit(fn, docs, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for full, toks in docs:
+            fn(full, toks)
+    return (time.perf_counter() - t0) / (repeat * len(docs))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    docs = load_corpus()
+    print(f"{len(docs)} resumes, {len(CANON)} canonical skills")
+
+    old = timeit(lambda full, toks: legacy_extract_skills(toks), docs, args.repeat)
+    new = timeit(lambda full, toks: extract_skills(toks, text=full), docs, args.repeat)
+    print(f"legacy loop : {old * 1e3:8.2f} ms/resume")
+    print(f"matcher     : {new * 1e3:8.2f} ms/resume  ({old / new:.1f}x)")
+
+    gained = lost = 0
+    for full, toks in docs:
+        a, b = set(legacy_extract_skills(toks)), set(extract_skills(toks, text=full))
+        gained += len(b - a)
+        lost += len(a - b)
+    print(f"skills found only by matcher: {gained}, only by legacy loop: {lost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: regex tokenizer backend vs NLTK word_tokenize for preprocess.tokens.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_tokenize [--repeat 20] [--starts 5]
+
+Startup = a fresh interpreter importing app.ai.preprocess and tokenizing one line
+(best of --starts), so NLTK's import and punkt loading are included. Per-document
+time is measured in-process over every PDF/DOCX in Uploaded_Resumes. The NLTK side
+needs punkt/punkt_tab already installed; it is skipped if they are missing.
+"""
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from app import config
+from app.pipeline import extract_text
+from app.ai import preprocess
+from app.ai.preprocess import sectionize, TOKENIZERS
+
+
+def startup(backend: str, starts: int) -> float:
+    env = {**os.environ, "TOKENIZER": backend}
+    code = "import app.ai.preprocess as p; p.tokens('warm up the tokenizer')"
+    best = float("inf")
+    for _ in range(starts):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def tokens_with(words, text):
+    toks = [w.lower() for w in words(text or "") if w.isalpha()]
+    return [w for w in toks if w not in preprocess._STOP and len(w) > 2]
+
+
+def per_doc(words, docs, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for full in docs:
+            tokens_with(words, full)
+    return (time.perf_counter() - t0) / (repeat * len(docs))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--starts", type=int, default=5)
+    args = ap.parse_args()
+
+    docs = [sectionize(extract_text(p, p.suffix.lower()))["__full__"]
+            for p in sorted(config.UPLOAD_DIR.glob("*")) if p.suffix.lower() in config.ALLOWED_EXT]
+    print(f"{len(docs)} resumes")
+
+    try:
+        TOKENIZERS["nltk"]("check punkt")
+        backends = ["regex", "nltk"]
+    except LookupError as e:
+        print(f"nltk backend skipped: {e.__class__.__name__} (punkt not installed)")
+        backends = ["regex"]
+
+    for name in backends:
+        print(f"{name:6s} startup : {startup(name, args.starts) * 1e3:8.1f} ms")
+    for name in backends:
+        print(f"{name:6s} per doc : {per_doc(TOKENIZERS[name], docs, args.repeat) * 1e3:8.3f} ms")
+
+    if len(backends) == 2:
+        same = only_regex = only_nltk = 0
+        for full in docs:
+            a = Counter(tokens_with(TOKENIZERS["regex"], full))
+            b = Counter(tokens_with(TOKENIZERS["nltk"], full))
+            same += sum((a & b).values())
+            only_regex += sum((a - b).values())
+            only_nltk += sum((b - a).values())
+        print(f"tokens in both: {same}, only regex: {only_regex}, only nltk: {only_nltk}")
+
+
+if __name__ == "__main__":
+    main()
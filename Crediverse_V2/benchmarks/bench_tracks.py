@@ -0,0 +1,60 @@
+"""
+Benchmark: top_tracks_many (sparse matmul + argpartition) vs a top_tracks loop.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_tracks [--n 100000] [--check 5000]
+
+Synthetic resumes draw 0-30 skills from the live vocabulary (SKILL_BANK + skills_map),
+plus a few unknown words. The loop is timed both with the precomputed SkillsMap and with
+the plain dict score_tracks() used to receive; --check rows are compared for identical
+output, matched-skill lists included.
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from app.ai.skills import SKILLS_MAP_PATH, current_skills, load_skills_map, top_tracks, top_tracks_many
+
+
+def synthetic(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = current_skills().canon + [f"unknown{i}" for i in range(50)]
+    return [rng.sample(vocab, rng.randint(0, 30)) for _ in range(n)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--check", type=int, default=5000)
+    args = ap.parse_args()
+
+    snap = current_skills()
+    raw = load_skills_map(SKILLS_MAP_PATH)
+    rows = synthetic(args.n)
+    print(f"{args.n} skill sets, {len(snap.tracks)} tracks, {len(snap.skill_tracks)} mapped skills")
+
+    t0 = time.perf_counter()
+    for r in rows:
+        top_tracks(r, raw)
+    dict_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    loop = [top_tracks(r, snap) for r in rows]
+    snap_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = top_tracks_many(rows, snap)
+    batch = time.perf_counter() - t0
+
+    print(f"loop, dict map    : {dict_loop:7.3f} s")
+    print(f"loop, SkillsMap   : {snap_loop:7.3f} s")
+    print(f"top_tracks_many   : {batch:7.3f} s  ({dict_loop / batch:.0f}x / {snap_loop / batch:.0f}x)")
+
+    sample = random.Random(1).sample(range(args.n), min(args.check, args.n))
+    bad = sum(res.top(i) != loop[i] for i in sample)
+    print(f"checked {len(sample)} rows: {bad} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: write-behind batched inserts vs one synchronous insert per analysis.
+
+Run from Crediverse_V2/:
+    python -m benchmarks.bench_writebehind [--rows 5000] [--rtt-ms 2] [--row-us 20]
+
+No MySQL needed: the "database" is a stub that sleeps --rtt-ms per round trip plus
+--row-us per row, roughly a LAN MySQL with a multi-row INSERT. Reports the latency a
+caller sees per row and overall rows/s, then runs an outage (every write fails) to
+check that rows land in the spill file and are replayed once the stub recovers.
+"""
+from __future__ import annotations
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.writebehind import WriteBehind
+
+
+class StubDB:
+    def __init__(self, rtt_s: float, row_s: float):
+        self.rtt_s, self.row_s = rtt_s, row_s
+        self.rows = 0
+        self.down = False
+        self._lock = threading.Lock()
+
+    def executemany(self, rows):
+        if self.down:
+            raise ConnectionError("db down")
+        time.sleep(self.rtt_s + self.row_s * len(rows))
+        with self._lock:
+            self.rows += len(rows)
+
+
+def row(i: int):
+    return (f"name{i}", "", 70, "2026-01-01_00:00:00", 1, "Data Science", "Fresher", "python, sql", "", "")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--rtt-ms", type=float, default=2.0)
+    ap.add_argument("--row-us", type=float, default=20.0)
+    args = ap.parse_args()
+    rtt, per_row = args.rtt_ms / 1e3, args.row_us / 1e6
+
+    db = StubDB(rtt, per_row)
+    t0 = time.perf_counter()
+    for i in range(args.rows):
+        db.executemany([row(i)])
+    sync = time.perf_counter() - t0
+    print(f"synchronous  : {sync / args.rows * 1e3:8.3f} ms/row caller latency, {args.rows / sync:9.0f} rows/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = StubDB(rtt, per_row)
+        w = WriteBehind(db.executemany, Path(tmp) / "spill.jsonl", flush_s=0.05).start()
+        t0 = time.perf_counter()
+        for i in range(args.rows):
+            w.put(row(i))
+        put = time.perf_counter() - t0
+        while db.rows < args.rows:
+            time.sleep(0.001)
+        total = time.perf_counter() - t0
+        w.stop()
+        print(f"write-behind : {put / args.rows * 1e3:8.3f} ms/row caller latency, {args.rows / total:9.0f} rows/s "
+              f"({sync / total:.0f}x)")
+
+        db = StubDB(rtt, per_row)
+        db.down = True
+        w = WriteBehind(db.executemany, Path(tmp) / "outage.jsonl", flush_s=0.05,
+                        retries=1, backoff_s=0.01, replay_s=0.2).start()
+        for i in range(1000):
+            w.put(row(i))
+        time.sleep(0.5)
+        spilled = w.stats()["spill_file_rows"]
+        db.down = False
+        deadline = time.monotonic() + 5
+        while db.rows < 1000 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        w.stop()
+        print(f"outage       : {spilled} rows spilled while down, {db.rows} written after recovery, "
+              f"stats {w.stats()}")
+
+
+if __name__ == "__main__":
+    main()
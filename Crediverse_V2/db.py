@@ -1,5 +1,17 @@
 # db.py
-from sqlalchemy import create_engine
+# One pooled SQLAlchemy engine per Streamlit process; every DB access goes through it.
+from collections import deque
+from contextlib import contextmanager
+import csv
+import datetime as dt
+import io
+import re
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import NullPool
 import streamlit as st
 
 # .streamlit/secrets.toml must contain:
@@ -8,12 +20,228 @@ import streamlit as st
 # user = "crediverse"
 # password = "YourStrongPass!23"
 # db = "cv"
+# # optional pool tuning
+# pool_size = 5
+# max_overflow = 10
+# pool_timeout = 30
+
+
+def mysql_cfg():
+    """Fetch MySQL secrets; return {} if missing."""
+    return st.secrets.get("mysql", {})
+
+
+def admin_creds():
+    """Admin username/password from secrets with sensible defaults."""
+    sec = st.secrets.get("admin", {})
+    return sec.get("username", "admin"), sec.get("password", "admin123")
+
+
+def mysql_url(with_db=True) -> URL:
+    cfg = mysql_cfg()
+    return URL.create(
+        "mysql+pymysql",
+        username=cfg.get("user", "root"),
+        password=cfg.get("password", ""),   # URL.create escapes special characters
+        host=cfg.get("host", "localhost"),
+        port=int(cfg["port"]) if cfg.get("port") else None,
+        database=cfg.get("db", "cv") if with_db else None,
+    )
+
+
+@st.cache_resource
+def get_engine():
+    """Process-wide engine; created on first use and shared by every session and rerun."""
+    cfg = mysql_cfg()
+    if not cfg:
+        raise RuntimeError("MySQL credentials not found in .streamlit/secrets.toml")
+    return create_engine(
+        mysql_url(),
+        pool_size=int(cfg.get("pool_size", 5)),
+        max_overflow=int(cfg.get("max_overflow", 10)),
+        pool_timeout=float(cfg.get("pool_timeout", 30)),
+        pool_pre_ping=True,          # survives idle disconnects
+        pool_recycle=1800,           # optional, refresh idle conns
+        connect_args={"autocommit": True},
+        future=True                  # SQLAlchemy 2.0 style
+    )
+
+
+class CheckoutStats:
+    """Time spent waiting for a pooled connection (last `window` checkouts)."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._recent.append(seconds)
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return {"checkouts": self.count}
+        return {
+            "checkouts": self.count,
+            "avg_ms": round(1000 * sum(recent) / len(recent), 2),
+            "p95_ms": round(1000 * recent[int(0.95 * (len(recent) - 1))], 2),
+            "max_ms": round(1000 * recent[-1], 2),
+        }
+
+
+@st.cache_resource
+def checkout_stats():
+    return CheckoutStats()
+
+
+def get_conn():
+    """
+    A pooled DBAPI (pymysql) connection in autocommit mode. close() hands it back to
+    the pool instead of disconnecting.
+    """
+    t0 = time.perf_counter()
+    conn = get_engine().raw_connection()
+    checkout_stats().record(time.perf_counter() - t0)
+    return conn
+
+
+@contextmanager
+def db_conn():
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def create_database():
+    """CREATE DATABASE IF NOT EXISTS on a one-off server connection (the pool needs the DB to exist)."""
+    server = create_engine(mysql_url(with_db=False), poolclass=NullPool)
+    try:
+        with server.connect() as c:
+            c.execute(text(f"CREATE DATABASE IF NOT EXISTS `{mysql_url().database}` "
+                           "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"))
+    finally:
+        server.dispose()
+
+
+def pool_stats():
+    """Pool size, overflow and usage plus checkout latency, for the Admin Settings tab."""
+    pool = get_engine().pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),   # negative until the pool has filled
+        **checkout_stats().snapshot(),
+    }
+
+
+# ---------- user_data browsing / export ----------
+# InnoDB's default FULLTEXT stopwords; they are never indexed, so they are left out of MATCH queries
+_FT_STOPWORDS = frozenset("a about an are as at be by com de en for from how i in is it la of on or that "
+                          "the this to was what when where who will with und www".split())
+
+
+def records_filter(q=None, date_from=None, date_to=None):
+    """
+    WHERE clause pieces + params for the Records search and date range. Words of 3+
+    characters go through the FULLTEXT index as prefix matches (all must match, stopwords
+    such as "com" are skipped); shorter queries fall back to a LIKE scan, since InnoDB
+    does not index tokens that short.
+    """
+    where, params = [], []
+    if q:
+        words = [w for w in re.findall(r"\w+", q.lower()) if w not in _FT_STOPWORDS]
+        if words and all(len(w) >= 3 for w in words):
+            where.append("MATCH(Name, Email_ID, Predicted_Field) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(" ".join(f"+{w}*" for w in words))
+        else:
+            where.append("(Name LIKE %s OR Email_ID LIKE %s OR Predicted_Field LIKE %s)")
+            like = f"%{q}%"
+            params += [like, like, like]
+    if date_from:
+        where.append("Timestamp >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("Timestamp < %s")
+        params.append(date_to + dt.timedelta(days=1))
+    return where, params
+
+
+def records_page(where, params, before_id=None, limit=50):
+    """
+    One page of user_data, newest first, by keyset on ID: rows with ID < before_id.
+    Returns (column names, rows); cost depends on the page size, not on the offset.
+    """
+    where = list(where)
+    params = list(params)
+    if before_id is not None:
+        where.append("ID < %s")
+        params.append(int(before_id))
+    sql = "SELECT * FROM user_data"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ID DESC LIMIT %s"
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.execute(sql, (*params, int(limit)))
+        return [d[0] for d in cur.description], cur.fetchall()
+
+
+def iter_records_csv(where, params, chunk_rows=5000):
+    """
+    CSV of every matching row as a stream of text chunks, one keyset page at a time.
+    Memory stays at one page however large the result; each page borrows a pooled
+    connection only while it is fetched.
+    """
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    before_id, header = None, False
+    while True:
+        cols, rows = records_page(where, params, before_id, chunk_rows)
+        if not header:
+            out.writerow(cols)
+            header = True
+        out.writerows(rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        if len(rows) < chunk_rows:
+            return
+        before_id = rows[-1][cols.index("ID")]
+
+
+# ---------- normalized skills (skills / candidate_skills) ----------
+def split_skills(skills_csv):
+    """Actual_skills as stored ("python, sql, docker") -> list of names."""
+    return [s.strip() for s in (skills_csv or "").split(",") if s.strip()]
+
+
+def seed_skills(cur, names):
+    """Add any missing names to the skills dimension (one multi-row INSERT IGNORE)."""
+    names = sorted({n[:100] for n in names if n})
+    if names:
+        cur.executemany("INSERT IGNORE INTO skills(name) VALUES (%s)", [(n,) for n in names])
+
+
+def skill_ids(cur, names):
+    """{lower-cased name: skill_id}, creating skills that are not known yet."""
+    names = sorted({n[:100] for n in names if n})
+    if not names:
+        return {}
+    seed_skills(cur, names)
+    cur.execute(f"SELECT skill_id, name FROM skills WHERE name IN ({','.join(['%s'] * len(names))})", names)
+    return {name.lower(): sid for sid, name in cur.fetchall()}
 
-cfg = st.secrets["mysql"]
 
-engine = create_engine(
-    f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['db']}",
-    pool_pre_ping=True,          # survives idle disconnects
-    pool_recycle=1800,           # optional, refresh idle conns
-    future=True                  # SQLAlchemy 2.0 style
-)
+def link_skills(cur, candidates):
+    """candidates: [(user_data.ID, [skill names])] -> candidate_skills rows, in bulk and idempotent."""
+    ids = skill_ids(cur, [n for _, names in candidates for n in names])
+    pairs = {(cid, ids[n[:100].lower()]) for cid, names in candidates for n in names if n[:100].lower() in ids}
+    if pairs:
+        cur.executemany("INSERT IGNORE INTO candidate_skills(candidate_id, skill_id) VALUES (%s,%s)", sorted(pairs))
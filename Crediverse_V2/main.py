@@ -1,20 +1,27 @@
 from pathlib import Path
-import uuid
-import tempfile
+import json
+import mimetypes
+import re
+import hashlib
+import asyncio
+import secrets
+from datetime import date
 from typing import Optional, List, Dict, Any
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Depends, Request, Response
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from pydantic import BaseModel
 
 # ---- your internal modules ----
 from app import config
-from app.parsing import extract_text_from_pdf, extract_text_from_docx
-from app.ai.preprocess import sectionize, tokens
-from app.ai.scoring import score_resume
-from app.ai.skills import extract_skills, infer_track, load_skills_map, top_tracks
-from app.ai.ats import coverage
-from app.ai.suggestions import suggestions
+from app.pipeline import analyze_file, persist_upload, get_analysis_pool, shutdown_analysis_pool
+from app.executor import Overloaded
+from app.jobs import JobWorkers, get_job_queue
+from app.search import get_resume_index
+from app.previews import check_signature
+from app.ai.preprocess import tokens
 
 
 # ---------- response schema (for docs) ----------
@@ -40,9 +47,91 @@ class AnalyzeResponse(BaseModel):
     suggestions: List[str]
     meta: Dict[str, Any]
 
+class QueueStats(BaseModel):
+    kind: str
+    workers: int
+    capacity: int
+    in_flight: int
+    queued: int
+
+class JobCreated(BaseModel):
+    id: str
+    status: str
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    filename: Optional[str] = None
+    created: float
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+class SearchHit(BaseModel):
+    key: str
+    name: str
+    score: float
+
+class SearchResponse(BaseModel):
+    indexed: int
+    results: List[SearchHit]
+
 
 app = FastAPI(title="AI Resume Analyzer API", version="1.0.0")
 
+_MB = 1024 * 1024
+_CHUNK = 64 * 1024
+
+
+class BodySizeLimit:
+    """
+    Caps request bodies before anything is buffered: a Content-Length over the limit is
+    refused outright, and a chunked/unknown-length body is counted as it arrives and cut
+    off with 413 as soon as it crosses the limit. Uploads are sized per route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def limit_for(path: str) -> int:
+        per_file = (config.MAX_FILE_MB + config.MAX_FORM_MB) * _MB
+        return {"/analyze": per_file,
+                "/jobs": per_file,
+                "/analyze/batch": per_file * config.MAX_BATCH_FILES}.get(path, config.MAX_FORM_MB * _MB)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit = self.limit_for(scope["path"])
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            return await self._reject(limit, scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {limit // _MB} MB.")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    async def _reject(limit: int, scope, receive, send):
+        resp = JSONResponse({"detail": f"Request body exceeds {limit // _MB} MB."}, status_code=413,
+                            headers={"Connection": "close"})
+        await resp(scope, receive, send)
+
+
+# innermost of the two, so CORS headers still reach a 413
+app.add_middleware(BodySizeLimit)
+
 # (optional) enable CORS for your frontend (edit origins as needed)
 app.add_middleware(
     CORSMiddleware,
@@ -53,20 +142,30 @@ app.add_middleware(
 )
 
 
-def _temp_save(upload: UploadFile) -> Path:
-    """Save UploadFile to a temp path preserving extension."""
-    suffix = Path(upload.filename or "").suffix.lower()
-    if suffix not in {".pdf", ".docx"}:
-        raise HTTPException(status_code=400, detail="Only .pdf or .docx allowed.")
-    tmpdir = Path(tempfile.gettempdir())
-    out = tmpdir / f"{uuid.uuid4().hex}{suffix}"
-    with out.open("wb") as f:
-        f.write(upload.file.read())
-    return out
+async def _read_upload(upload: UploadFile) -> bytes:
+    """Read one file in chunks, failing with 413 the moment it passes MAX_FILE_MB."""
+    limit = config.MAX_FILE_MB * _MB
+    too_big = HTTPException(status_code=413, detail=f"File exceeds the {config.MAX_FILE_MB} MB limit.")
+    if upload.size is not None and upload.size > limit:
+        raise too_big
+    chunks, total = [], 0
+    while chunk := await upload.read(_CHUNK):
+        total += len(chunk)
+        if total > limit:
+            raise too_big
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _overloaded(exc: Overloaded) -> HTTPException:
+    """Fast rejection when the analysis pool is full; clients should back off and retry."""
+    return HTTPException(status_code=503, detail=f"Server busy ({exc}). Retry shortly.",
+                         headers={"Retry-After": str(config.RETRY_AFTER_S)})
 
 
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="PDF or DOCX resume"),
     job_description: Optional[str] = Form(None, description="Optional JD text"),
 ):
@@ -74,90 +173,248 @@ async def analyze(
     Upload a resume (PDF/DOCX). Optionally include a Job Description.
     Returns structured JSON with score, skills, tracks, ATS, and suggestions.
     """
-    # ---- validate + save ----
+    # ---- validate ----
     ext = Path(file.filename or "").suffix.lower()
     if ext not in {".pdf", ".docx"}:
         raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF or DOCX.")
 
-    # enforce size limit using your config
-    data = await file.read()
-    size_mb = len(data) / 1024 / 1024
-    if size_mb > config.MAX_FILE_MB:
-        raise HTTPException(status_code=413, detail=f"File is {size_mb:.1f} MB; limit {config.MAX_FILE_MB} MB.")
-    # we need file.read() again later; reset the stream by using saved bytes
-    upload_clone = UploadFile(filename=file.filename, file=bytes_to_filelike(data))
-
-    # save once to temp so your extractors (path-based) can work
-    saved_path = _temp_save(upload_clone)
-
-    # ---- extract text ----
-    if ext == ".pdf":
-        resume_text = extract_text_from_pdf(str(saved_path))
-    else:
-        resume_text = extract_text_from_docx(str(saved_path))
-
-    # ---- ai pipeline ----
-    sections = sectionize(resume_text)
-    score, score_details_raw = score_resume(sections)
-    auto_tokens = tokens(sections["__full__"])
-    auto_skills = extract_skills(auto_tokens)
-
-    # tracks
-    skills_map = load_skills_map(config.BASE_DIR / "app" / "ai" / "skills_map.json")
-    track_list = top_tracks(auto_skills, skills_map, k=3)  # [(track, score, matched)]
-    fallback = infer_track(auto_skills)
-    best_track = track_list[0][0] if (track_list and track_list[0][1] > 0) else (fallback or "General Software")
-
-    # ats coverage (optional)
-    ats_block = None
-    if job_description and job_description.strip():
-        pct, present, missing = coverage(sections["__full__"], job_description)
-        ats_block = {
-            "percent": pct,
-            "present": present[:100],
-            "missing": missing[:100],
-        }
-
-    pages = len(sections.get("__pages__", [])) or 1
-    user_level = "Fresher" if pages == 1 else ("Intermediate" if pages == 2 else "Experienced")
-
-    # normalize structures for response_model
-    score_details = [
-        {"key": k, "present": bool(present), "weight": float(w)}
-        for (k, present, w) in score_details_raw
-    ]
-    tracks = [
-        {"name": t, "score": float(sc), "matched": matched or []}
-        for (t, sc, matched) in (track_list or [])
-    ]
-
-    # build response
-    resp = {
-        "score": int(score),
-        "score_details": score_details,
-        "detected_skills": auto_skills,
-        "suggested_track": best_track,
-        "tracks": tracks,
-        "pages": int(pages),
-        "user_level": user_level,
-        "ats": ats_block,
-        "suggestions": list(suggestions(sections, auto_skills, ats_block["missing"] if ats_block else [])),
-        "meta": {
-            "filename": file.filename,
-            "ext": ext,
-            "size_mb": round(size_mb, 3),
-        },
-    }
+    # enforce size limit using your config (the request body is already capped by BodySizeLimit)
+    data = await _read_upload(file)
+    size_mb = len(data) / _MB
+
+    # ---- extract text + ai pipeline (parsed straight from memory, off the event loop) ----
     try:
-        saved_path.unlink(missing_ok=True)
-    except Exception:
-        pass
+        sha = hashlib.sha256(data).hexdigest()
+        fut = get_analysis_pool().submit(analyze_file, data, ext, job_description, sha, file.filename or "")
+    except Overloaded as exc:
+        raise _overloaded(exc)
+    resp = await asyncio.wrap_future(fut)
+    resp["meta"] = {
+        "filename": file.filename,
+        "ext": ext,
+        "size_mb": round(size_mb, 3),
+    }
+    if config.PERSIST_UPLOADS:
+        background_tasks.add_task(persist_upload, data, ext, sha, file.filename, source="api")
     return resp
 
 
-# helper: recreate a file-like object from bytes (so we can save once)
-from io import BytesIO
-def bytes_to_filelike(b: bytes):
-    bio = BytesIO(b)
-    bio.seek(0)
-    return bio
\ No newline at end of file
+@app.post("/analyze/batch")
+async def analyze_batch(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="PDF or DOCX resumes"),
+    job_description: Optional[str] = Form(None, description="Optional JD text, applied to every file"),
+):
+    """
+    Upload many resumes (PDF/DOCX) plus an optional Job Description.
+    Each file runs through the /analyze pipeline in the analysis pool; results stream
+    back as NDJSON, one line per file, in completion order:
+      {"index": 0, "filename": "...", "result": {...AnalyzeResponse...}}
+      {"index": 1, "filename": "...", "error": "..."}
+    The batch is admitted whole or rejected with 503 if the pool cannot queue every file.
+    """
+    if len(files) > config.MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"{len(files)} files; limit {config.MAX_BATCH_FILES} per batch.")
+
+    rejected: List[Dict[str, Any]] = []
+    accepted: List[tuple] = []  # (index, filename, ext, size_mb, bytes, sha256)
+
+    # ---- validate (bytes go to the workers; nothing touches disk) ----
+    for i, upload in enumerate(files):
+        ext = Path(upload.filename or "").suffix.lower()
+        if ext not in config.ALLOWED_EXT:
+            rejected.append({"index": i, "filename": upload.filename, "error": "Unsupported file type. Use PDF or DOCX."})
+            continue
+        try:
+            data = await _read_upload(upload)
+        except HTTPException as exc:
+            rejected.append({"index": i, "filename": upload.filename, "error": exc.detail})
+            continue
+        size_mb = len(data) / _MB
+        accepted.append((i, upload.filename, ext, size_mb, data, hashlib.sha256(data).hexdigest()))
+
+    # ---- fan out ----
+    try:
+        futures = get_analysis_pool().submit_all(
+            [(analyze_file, (data, ext, job_description, sha, filename or ""))
+             for _, filename, ext, _, data, sha in accepted])
+    except Overloaded as exc:
+        raise _overloaded(exc)
+    pending: Dict[asyncio.Future, tuple] = {}  # future -> (index, filename, ext, size_mb)
+    for fut, (i, filename, ext, size_mb, data, sha) in zip(futures, accepted):
+        pending[asyncio.wrap_future(fut)] = (i, filename, ext, size_mb)
+        if config.PERSIST_UPLOADS:
+            background_tasks.add_task(persist_upload, data, ext, sha, filename, source="api")
+
+    async def stream():
+        waiting = set(pending)
+        try:
+            for line in rejected:
+                yield json.dumps(line) + "\n"
+            while waiting:
+                done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    i, filename, ext, size_mb = pending[fut]
+                    line: Dict[str, Any] = {"index": i, "filename": filename}
+                    if fut.exception() is not None:
+                        line["error"] = f"Analysis failed: {fut.exception()}"
+                    else:
+                        resp = fut.result()
+                        resp["meta"] = {"filename": filename, "ext": ext, "size_mb": round(size_mb, 3)}
+                        line["result"] = resp
+                    yield json.dumps(line) + "\n"
+        finally:
+            # client went away: drop work that has not started
+            for fut in waiting:
+                fut.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", background=background_tasks)
+
+
+@app.post("/jobs", response_model=JobCreated, status_code=202)
+async def create_job(
+    file: UploadFile = File(..., description="PDF or DOCX resume"),
+    job_description: Optional[str] = Form(None, description="Optional JD text"),
+):
+    """
+    Queue a resume for analysis and return its job id at once; poll GET /jobs/{id}.
+    Jobs are stored on disk, so queued work survives a restart.
+    """
+    ext = Path(file.filename or "").suffix.lower()
+    if ext not in config.ALLOWED_EXT:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Use PDF or DOCX.")
+    data = await _read_upload(file)
+
+    queue = get_job_queue()
+    if queue.pending() >= config.JOB_QUEUE_MAX:
+        raise HTTPException(status_code=503, detail="Job queue is full. Retry shortly.",
+                            headers={"Retry-After": str(config.RETRY_AFTER_S)})
+    job_id = queue.enqueue(data, ext, file.filename or "", job_description, hashlib.sha256(data).hexdigest())
+    if _job_workers is not None:
+        _job_workers.notify()
+    return {"id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    """Job status (queued, running, done, failed); `result` is the AnalyzeResponse once done."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    return job
+
+
+@app.get("/queue", response_model=QueueStats)
+def queue():
+    """Analysis pool load: workers, capacity, files in flight and how many are waiting."""
+    return get_analysis_pool().stats()
+
+
+_basic = HTTPBasic()
+
+def _require_admin(creds: HTTPBasicCredentials = Depends(_basic)) -> None:
+    """Admin credentials from .streamlit/secrets.toml, same as the Streamlit Admin mode."""
+    from db import admin_creds  # db.py reads Streamlit secrets; only the admin routes need it
+    user, password = admin_creds()
+    ok = secrets.compare_digest(creds.username.encode(), user.encode()) & \
+         secrets.compare_digest(creds.password.encode(), password.encode())
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials.",
+                            headers={"WWW-Authenticate": "Basic"})
+
+
+@app.post("/search", response_model=SearchResponse, dependencies=[Depends(_require_admin)])
+def search(
+    job_description: str = Form(..., description="JD text to rank stored resumes against"),
+    k: int = Form(10, ge=1, le=500, description="How many resumes to return"),
+):
+    """
+    Rank every resume analyzed so far (via /analyze, /analyze/batch or the Streamlit
+    app) against a Job Description using the BM25 index; returns the top k. Results
+    carry candidate names, so this needs the admin credentials, like the CSV export.
+    """
+    index = get_resume_index()
+    return {"indexed": len(index), "results": index.search(tokens(job_description), k=k)}
+
+
+@app.get("/export/user_data.csv", dependencies=[Depends(_require_admin)])
+def export_user_data(q: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """
+    user_data rows matching the Records filters as CSV, newest first. Rows are read in
+    keyset chunks of EXPORT_CHUNK_ROWS and streamed out, so memory does not grow with
+    the result.
+    """
+    from db import iter_records_csv, records_filter
+    where, params = records_filter(q, date_from, date_to)
+    chunks = iter_records_csv(where, params, chunk_rows=config.EXPORT_CHUNK_ROWS)
+    return StreamingResponse(chunks, media_type="text/csv",
+                             headers={"Content-Disposition": 'attachment; filename="user_data.csv"'})
+
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+def _iter_file(path: Path, start: int, length: int, chunk: int = 64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(chunk, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+@app.get("/uploads/{name}")
+def get_upload(name: str, request: Request, exp: int, sig: str):
+    """
+    A saved upload (PDF preview source), by a signed URL from app.previews.preview_url.
+    Supports ETag revalidation and single byte ranges, so viewers can fetch lazily.
+    """
+    if not check_signature(name, exp, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired link.")
+    path = (config.UPLOAD_DIR / name).resolve()
+    if path.parent != config.UPLOAD_DIR or not path.is_file():
+        raise HTTPException(status_code=404, detail="No such upload.")
+
+    stat = path.stat()
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, max-age=86400",
+               "Content-Disposition": "inline"}
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    m = _RANGE.fullmatch(request.headers.get("range", "").strip())
+    if m and request.headers.get("if-range", etag) == etag and m.group(1) + m.group(2):
+        if m.group(1):
+            start = int(m.group(1))
+            end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+        else:  # suffix range: the last N bytes
+            start, end = max(size - int(m.group(2)), 0), size - 1
+        if start >= size or start > end:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        length = end - start + 1
+        return StreamingResponse(_iter_file(path, start, length), status_code=206, media_type=media_type,
+                                 headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}",
+                                          "Content-Length": str(length)})
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+_job_workers: Optional[JobWorkers] = None
+
+@app.on_event("startup")
+def _start_job_workers():
+    global _job_workers
+    queue = get_job_queue()
+    queue.purge(config.JOB_RETENTION_H * 3600)
+    _job_workers = JobWorkers(queue, lambda *args: get_analysis_pool().submit(analyze_file, *args),
+                              busy=Overloaded, threads=config.JOB_WORKERS, backoff_s=config.RETRY_AFTER_S)
+    _job_workers.start()
+
+
+@app.on_event("shutdown")
+def _shutdown_pool():
+    if _job_workers is not None:
+        _job_workers.stop()
+    shutdown_analysis_pool()
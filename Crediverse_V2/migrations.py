@@ -0,0 +1,138 @@
+# migrations.py
+# Versioned schema changes for the MySQL database, applied in order by init_db().
+# Each migration runs once; applied versions are recorded in schema_migrations.
+# MySQL commits DDL implicitly, so every step checks the current schema first and
+# a migration interrupted halfway can simply be run again.
+from db import db_conn, link_skills, split_skills
+
+_LOCK = "crediverse_schema_migrations"
+
+
+def _column_type(cur, table, column):
+    cur.execute("SELECT DATA_TYPE FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s", (table, column))
+    row = cur.fetchone()
+    return row[0].lower() if row else None
+
+
+def _has_index(cur, table, name):
+    cur.execute("SELECT 1 FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1", (table, name))
+    return cur.fetchone() is not None
+
+
+def _m1_create_user_data(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_data(
+            ID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            Name VARCHAR(200),
+            Email_ID VARCHAR(200),
+            Resume_Score INT,
+            Timestamp VARCHAR(50),
+            Page_no INT,
+            Predicted_Field VARCHAR(100),
+            User_level VARCHAR(50),
+            Actual_skills TEXT,
+            Recommended_skills TEXT,
+            Recommended_courses TEXT
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+
+
+def _m2_timestamp_datetime(cur):
+    """Timestamp VARCHAR '%Y-%m-%d_%H:%M:%S' -> DATETIME; unparseable values become NULL."""
+    if _column_type(cur, "user_data", "Timestamp") == "datetime":
+        return
+    if _column_type(cur, "user_data", "Timestamp_dt") is None:
+        cur.execute("ALTER TABLE user_data ADD COLUMN Timestamp_dt DATETIME NULL AFTER Timestamp")
+    # the REGEXP guard keeps STR_TO_DATE away from junk, which strict mode would turn into an error
+    cur.execute("UPDATE user_data SET Timestamp_dt = STR_TO_DATE(REPLACE(Timestamp, '_', ' '), '%Y-%m-%d %H:%i:%s') "
+                "WHERE Timestamp REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}[_ ][0-9]{2}:[0-9]{2}:[0-9]{2}$'")
+    cur.execute("ALTER TABLE user_data DROP COLUMN Timestamp, "
+                "CHANGE COLUMN Timestamp_dt Timestamp DATETIME NULL")
+
+
+def _m3_indexes(cur):
+    """Indexes for the Records filters / dashboard group-bys, and FULLTEXT for the search box."""
+    for name, ddl in [
+        ("ix_user_data_timestamp", "CREATE INDEX ix_user_data_timestamp ON user_data(Timestamp)"),
+        ("ix_user_data_field", "CREATE INDEX ix_user_data_field ON user_data(Predicted_Field)"),
+        ("ix_user_data_email", "CREATE INDEX ix_user_data_email ON user_data(Email_ID)"),
+        ("ft_user_data_search",
+         "CREATE FULLTEXT INDEX ft_user_data_search ON user_data(Name, Email_ID, Predicted_Field)"),
+    ]:
+        if not _has_index(cur, "user_data", name):
+            cur.execute(ddl)
+
+
+def _m4_skill_tables(cur):
+    """skills dimension + candidate_skills link table (indexed both ways), backfilled from Actual_skills."""
+    if _column_type(cur, "user_data", "Analysis_UID") is None:
+        # set by the writer so a retried batch can find (and not duplicate) its rows
+        cur.execute("ALTER TABLE user_data ADD COLUMN Analysis_UID CHAR(32) NULL AFTER ID, "
+                    "ADD UNIQUE KEY ux_user_data_uid (Analysis_UID)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS skills(
+            skill_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            UNIQUE KEY ux_skills_name (name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_skills(
+            candidate_id INT NOT NULL,
+            skill_id INT NOT NULL,
+            PRIMARY KEY (candidate_id, skill_id),
+            KEY ix_candidate_skills_skill (skill_id, candidate_id),
+            CONSTRAINT fk_cs_candidate FOREIGN KEY (candidate_id) REFERENCES user_data(ID) ON DELETE CASCADE,
+            CONSTRAINT fk_cs_skill FOREIGN KEY (skill_id) REFERENCES skills(skill_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    last = 0
+    while True:
+        cur.execute("SELECT ID, Actual_skills FROM user_data WHERE ID > %s ORDER BY ID LIMIT 5000", (last,))
+        rows = cur.fetchall()
+        if not rows:
+            break
+        link_skills(cur, [(cid, split_skills(skills)) for cid, skills in rows])
+        last = rows[-1][0]
+
+
+MIGRATIONS = [
+    (1, "create user_data", _m1_create_user_data),
+    (2, "user_data.Timestamp as DATETIME", _m2_timestamp_datetime),
+    (3, "user_data indexes + FULLTEXT search", _m3_indexes),
+    (4, "skills + candidate_skills", _m4_skill_tables),
+]
+
+
+def migrate():
+    """
+    Apply pending migrations; returns the versions applied by this call. A named lock
+    keeps two app processes from migrating at the same time.
+    """
+    applied_now = []
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations(
+                version INT NOT NULL PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        cur.execute("SELECT GET_LOCK(%s, 60)", (_LOCK,))
+        if cur.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for another process to finish migrating.")
+        try:
+            cur.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cur.fetchall()}
+            for version, name, step in MIGRATIONS:
+                if version in done:
+                    continue
+                step(cur)
+                cur.execute("INSERT INTO schema_migrations(version, name) VALUES (%s, %s)", (version, name))
+                applied_now.append(version)
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK,))
+            cur.fetchall()
+    return applied_now
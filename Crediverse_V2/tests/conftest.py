@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the app is imported as top-level modules (app.*, db, ...) from Crediverse_V2/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
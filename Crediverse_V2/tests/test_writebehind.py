@@ -0,0 +1,116 @@
+import json
+
+from app.writebehind import WriteBehind
+
+
+class RowError(Exception):
+    """Stands in for IntegrityError / DataError: the rows are at fault."""
+
+
+class FakeDB:
+    """flush() target: rejects rows whose name starts with "bad"; `down` makes every call fail."""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.calls = 0
+
+    def flush(self, rows):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("server has gone away")
+        if any(r[0].startswith("bad") for r in rows):
+            raise RowError("bad row")
+        self.rows.extend(rows)
+
+
+def _writer(db, tmp_path, **kw):
+    kw = {"retries": 0, "backoff_s": 0, "flush_s": 0.01, "row_errors": (RowError,), **kw}
+    return WriteBehind(db.flush, tmp_path / "pending.jsonl", **kw)
+
+
+def _lines(path):
+    return [json.loads(ln) for ln in path.read_text().splitlines()] if path.exists() else []
+
+
+def _rows(*names):
+    return [(n, 1) for n in names]
+
+
+def test_bad_rows_at_head_do_not_block_the_batch(tmp_path):
+    db = FakeDB()
+    w = _writer(db, tmp_path)
+    w._write(_rows("bad1", "bad2", "good1", "good2"))
+    stats = w.stats()
+    assert sorted(r[0] for r in db.rows) == ["good1", "good2"]
+    assert (stats["written"], stats["spilled"], stats["dead_lettered"]) == (2, 0, 2)
+    assert sorted(r[0] for r in _lines(w.dead_path)) == ["bad1", "bad2"]
+    assert not w.spill_path.exists()
+
+
+def test_single_bad_row_is_isolated(tmp_path):
+    db = FakeDB()
+    w = _writer(db, tmp_path)
+    names = [f"good{i}" for i in range(15)]
+    names.insert(9, "bad9")
+    w._write(_rows(*names))
+    assert len(db.rows) == 15
+    assert [r[0] for r in _lines(w.dead_path)] == ["bad9"]
+
+
+def test_outage_spills_and_replay_writes_back(tmp_path):
+    db = FakeDB()
+    db.down = True
+    w = _writer(db, tmp_path)
+    w._write(_rows("a", "b", "c"))
+    assert w.stats()["spilled"] == 3 and w.stats()["dead_lettered"] == 0
+    assert db.calls == 1  # no splitting while the database is down
+
+    w._replay()  # still down: rows stay in the spill file
+    assert [r[0] for r in _lines(w.spill_path)] == ["a", "b", "c"]
+
+    db.down = False
+    w._replay()
+    assert [r[0] for r in db.rows] == ["a", "b", "c"]
+    assert w.stats()["replayed"] == 3 and w.stats()["spill_file_rows"] == 0
+
+
+def test_outage_during_split_spills_only_unwritten_rows(tmp_path):
+    db = FakeDB()
+    w = _writer(db, tmp_path)
+    flush = db.flush
+
+    def flaky(rows):  # the bad row is found, then the server goes away
+        flush(rows)
+        db.down = True
+
+    def first_then_flaky(rows):
+        w.flush = flaky
+        flush(rows)
+
+    w.flush = first_then_flaky
+    w._write(_rows("bad0", "g1", "g2", "g3"))
+    assert [r[0] for r in db.rows] == ["g1"]
+    assert sorted(r[0] for r in _lines(w.spill_path)) == ["g2", "g3"]
+    assert [r[0] for r in _lines(w.dead_path)] == ["bad0"]
+
+
+def test_replay_dead_letters_torn_lines_and_bad_rows(tmp_path):
+    db = FakeDB()
+    w = _writer(db, tmp_path)
+    w.spill_path.write_text('["good1", 1]\n["bad1", 1]\n["gone", 1\n["good2", 1]\n')
+    w._replay()
+    assert [r[0] for r in db.rows] == ["good1", "good2"]
+    dead = w.dead_path.read_text().splitlines()
+    assert dead[0] == '["gone", 1' and json.loads(dead[1])[0] == "bad1"
+    assert not w.spill_path.exists()
+
+
+def test_writer_thread_drains_queue_on_stop(tmp_path):
+    db = FakeDB()
+    w = _writer(db, tmp_path, batch_size=3).start()
+    for row in _rows("bad1", "bad2", "good1", "good2", "good3"):
+        w.put(row)
+    w.stop()
+    assert sorted(r[0] for r in db.rows) == ["good1", "good2", "good3"]
+    assert w.stats()["dead_lettered"] == 2 and w.stats()["spill_file_rows"] == 0